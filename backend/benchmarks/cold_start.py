@@ -0,0 +1,208 @@
+"""
+Cold-start profiling for the PRPay API.
+
+Two modes, both run from the backend directory:
+
+    # Import time per module when loading the app (python -X importtime)
+    python -m benchmarks.cold_start imports [--top 25]
+
+    # Time to first response for /, an ignored and a processed webhook, and /getPRs,
+    # each in a fresh process
+    python -m benchmarks.cold_start first-response [--runs 5] [--user-id user1] [--db-backend local]
+
+The processed webhook writes rows, so it always runs against the in-memory
+database. /getPRs only reads and runs against Supabase when credentials are set
+(environment or .env) and the in-memory database otherwise; --db-backend
+overrides the choice. Targets that answered with a 5xx are flagged. Pass --json
+to either mode for machine-readable output.
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+from dotenv import dotenv_values
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+
+def profile_imports(module: str = "main") -> list[dict]:
+    """Import `module` in a fresh interpreter and return per-module import times in ms."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{proc.stderr}")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        # import time:   self [us] |  cumulative | imported package
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append(
+            {
+                "module": name.strip(),
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+            }
+        )
+    return rows
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _load_fixture(name: str) -> dict:
+    return json.loads((FIXTURES_DIR / f"{name}.json").read_text())
+
+
+def supabase_configured() -> bool:
+    """Whether the app will find Supabase credentials, as config.py would load them."""
+    values = {**dotenv_values(BACKEND_DIR / ".env"), **os.environ}
+    return bool(values.get("SUPABASE_URL") and values.get("SUPABASE_SERVICE_KEY"))
+
+
+def _targets(user_id: str) -> dict[str, tuple[str, str, dict | None, str | None]]:
+    """name -> (method, path, body, database access: None, "read" or "write")."""
+    return {
+        "root": ("GET", "/", None, None),
+        # synchronize is acknowledged before the database is touched
+        "webhook_ignored": ("POST", "/webhooks/github/pull-request", _load_fixture("pull_request_synchronize"), None),
+        # opened loads the DB client and writes the repository and PR rows
+        "webhook_opened": ("POST", "/webhooks/github/pull-request", _load_fixture("pull_request_opened"), "write"),
+        "getPRs": ("GET", f"/getPRs?user_id={user_id}", None, "read"),
+    }
+
+
+def time_to_first_response(
+    method: str,
+    path: str,
+    body: dict | None = None,
+    timeout: float = 60.0,
+    env: dict[str, str] | None = None,
+) -> tuple[float, int]:
+    """Boot the app in a new uvicorn process and time until `path` answers.
+
+    Returns (milliseconds from process spawn to first response, status code).
+    """
+    port = _free_port()
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env={**os.environ, **(env or {})},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=timeout) as client:
+            while True:
+                try:
+                    response = client.request(method, path, json=body)
+                    return (time.perf_counter() - start) * 1000, response.status_code
+                except httpx.TransportError:
+                    if server.poll() is not None:
+                        raise RuntimeError("uvicorn exited before serving a response")
+                    if time.perf_counter() - start > timeout:
+                        raise TimeoutError(f"No response from {path} within {timeout}s")
+                    time.sleep(0.005)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def benchmark_first_response(runs: int, user_id: str, db_backend: str) -> dict[str, dict]:
+    results = {}
+    for name, (method, path, body, db_access) in _targets(user_id).items():
+        # Never replay the fixed fixture against a real project: it would create
+        # rows and a review partition there, and fail on the duplicate PR URL
+        # on every later run.
+        backend = "local" if db_access == "write" else db_backend
+        samples = []
+        statuses = []
+        for _ in range(runs):
+            elapsed_ms, status = time_to_first_response(method, path, body, env={"DB_BACKEND": backend})
+            samples.append(elapsed_ms)
+            statuses.append(status)
+        result = {
+            "method": method,
+            "path": path.split("?")[0],
+            "db_backend": backend if db_access else None,
+            "runs": runs,
+            "min_ms": min(samples),
+            "median_ms": statistics.median(samples),
+            "max_ms": max(samples),
+            "status_codes": sorted(set(statuses)),
+        }
+        server_errors = sum(status >= 500 for status in statuses)
+        if server_errors:
+            note = f"{server_errors}/{runs} runs answered with a 5xx"
+            if db_access and backend == "supabase" and not supabase_configured():
+                note += ": Supabase credentials are not set (try --db-backend local)"
+            result["note"] = note
+        results[name] = result
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--json", action="store_true", help="Emit JSON instead of a table")
+    sub = parser.add_subparsers(dest="mode", required=True)
+
+    imports = sub.add_parser("imports", help="Report import time per module")
+    imports.add_argument("--top", type=int, default=25, help="Number of slowest modules to show")
+    imports.add_argument("--module", default="main", help="Module to import")
+
+    first = sub.add_parser("first-response", help="Measure time to first response")
+    first.add_argument("--runs", type=int, default=5)
+    first.add_argument("--user-id", default="user1", help="user_id passed to /getPRs")
+    first.add_argument(
+        "--db-backend",
+        choices=("supabase", "local"),
+        help="DB_BACKEND for /getPRs (default: supabase if credentials are set, else local)",
+    )
+
+    args = parser.parse_args()
+
+    if args.mode == "imports":
+        rows = profile_imports(args.module)
+        rows.sort(key=lambda r: r["cumulative_ms"], reverse=True)
+        rows = rows[: args.top]
+        if args.json:
+            print(json.dumps(rows, indent=2))
+            return
+        print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+        for row in rows:
+            print(f"{row['cumulative_ms']:>14.1f} {row['self_ms']:>9.1f}  {row['module']}")
+    else:
+        db_backend = args.db_backend or ("supabase" if supabase_configured() else "local")
+        results = benchmark_first_response(args.runs, args.user_id, db_backend)
+        if args.json:
+            print(json.dumps(results, indent=2))
+            return
+        print(f"DB_BACKEND={db_backend}")
+        print(f"{'target':<16} {'min ms':>9} {'median ms':>10} {'max ms':>9}  status")
+        for name, r in results.items():
+            note = f"  ({r['note']})" if "note" in r else ""
+            print(
+                f"{name:<16} {r['min_ms']:>9.1f} {r['median_ms']:>10.1f} {r['max_ms']:>9.1f}  "
+                f"{','.join(map(str, r['status_codes']))}{note}"
+            )
+
+
+if __name__ == "__main__":
+    main()
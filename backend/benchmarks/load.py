@@ -0,0 +1,411 @@
+"""
+End-to-end load benchmark for the PRPay API against local stand-ins.
+
+The app runs in-process against the in-memory database (DB_BACKEND=local) and,
+for claims, a local anvil node running with Base Sepolia's chain ID. Recorded
+GitHub webhook fixtures are replayed to build a synthetic data set, then each
+endpoint is driven at the configured concurrency:
+
+    python -m benchmarks.load --users 50 --prs 1000 --requests 2000 --concurrency 32 \\
+        --output results.json [--compare baseline.json]
+
+Claims need anvil (https://book.getfoundry.sh) on PATH, or --rpc-url pointing at
+a running dev node with chain ID 84532 on which --wallet-key is funded. Without
+either, the claim phase is skipped.
+
+Admission control (limiter.py) is turned off unless --limiter is passed, so
+requests are measured rather than shed with 429; the report records which.
+
+Per endpoint the report contains p50/p95/p99 latency and throughput of
+successful requests, error and 429 counts, and DB/RPC calls per request.
+"""
+import argparse
+import asyncio
+import copy
+import json
+import math
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+import httpx
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+# First two well-known anvil dev accounts: the payer and the claim recipient.
+ANVIL_PRIVATE_KEY = "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80"
+RECIPIENT_ADDRESS = "0x70997970C51812dc3A010C7d01b50e0d17dc79C8"
+BASE_SEPOLIA_CHAIN_ID = 84532
+
+
+def load_fixture(name: str) -> dict[str, Any]:
+    return json.loads((FIXTURES_DIR / f"{name}.json").read_text())
+
+
+def repository_url(repo_id: int) -> str:
+    return f"https://github.com/example/repo-{repo_id}"
+
+
+def render_fixture(fixture: dict[str, Any], pr_number: int, reviewer_id: int, repo_id: int) -> dict[str, Any]:
+    """Re-target a recorded webhook payload at a synthetic repository, PR and reviewer."""
+    payload = copy.deepcopy(fixture)
+    payload["repository"].update(
+        id=repo_id,
+        name=f"repo-{repo_id}",
+        full_name=f"example/repo-{repo_id}",
+        html_url=repository_url(repo_id),
+    )
+    pr = payload["pull_request"]
+    url = f"{repository_url(repo_id)}/pull/{pr_number}"
+    pr.update(id=2_000_000_000 + pr_number, number=pr_number, html_url=url, title=f"Synthetic PR #{pr_number}")
+    if "number" in payload:
+        payload["number"] = pr_number
+    reviewer = {"id": reviewer_id, "login": f"reviewer_{reviewer_id}"}
+    if "requested_reviewer" in payload:
+        payload["requested_reviewer"] = reviewer
+        pr["requested_reviewers"] = [reviewer]
+    if "review" in payload:
+        payload["review"]["user"] = reviewer
+        payload["review"]["id"] = 3_000_000_000 + pr_number
+    return payload
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an unsorted list."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+class CallCounter:
+    """Snapshots DB (local stand-in) and RPC call counts around a phase."""
+
+    def __init__(self):
+        self.rpc: Counter[str] = Counter()
+
+    def reset(self) -> None:
+        from db import get_db
+
+        get_db().reset_stats()  # type: ignore[attr-defined]
+        self.rpc.clear()
+
+    def snapshot(self) -> tuple[Counter, Counter]:
+        from db import get_db
+
+        db_calls = Counter({f"{table}.{op}": n for (table, op), n in get_db().stats.items()})  # type: ignore[attr-defined]
+        return db_calls, Counter(self.rpc)
+
+    def attach_rpc(self, w3: Any) -> None:
+        from web3.middleware import Web3Middleware
+
+        counts = self.rpc
+
+        class CountingMiddleware(Web3Middleware):
+            def wrap_make_request(self, make_request):
+                def middleware(method, params):
+                    counts[method] += 1
+                    return make_request(method, params)
+
+                return middleware
+
+        w3.middleware_onion.add(CountingMiddleware, name="benchmark_rpc_counter")
+
+
+async def run_phase(
+    name: str,
+    send: Callable[[int], Awaitable[httpx.Response]],
+    total: int,
+    concurrency: int,
+    counter: CallCounter,
+) -> dict[str, Any]:
+    """Issue `total` requests through `send` with at most `concurrency` in flight."""
+    counter.reset()
+    # Latency of successful responses only: failures and rejections return
+    # early and would make an endpoint look faster.
+    latencies: list[float] = []
+    statuses: Counter[int] = Counter()
+    errors = 0
+    rejected = 0
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index, errors, rejected
+        while next_index < total:
+            index = next_index
+            next_index += 1
+            start = time.perf_counter()
+            try:
+                response = await send(index)
+            except httpx.HTTPError:
+                errors += 1
+                continue
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            statuses[response.status_code] += 1
+            try:
+                body = response.json()
+            except ValueError:
+                body = None
+            if response.status_code == 429:
+                rejected += 1
+            elif response.status_code >= 400 or (isinstance(body, dict) and body.get("success") is False):
+                errors += 1
+            else:
+                latencies.append(elapsed_ms)
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, total))))
+    wall = time.perf_counter() - wall_start
+
+    db_calls, rpc_calls = counter.snapshot()
+    return {
+        "endpoint": name,
+        "requests": total,
+        "successes": len(latencies),
+        "errors": errors,
+        "rejected_429": rejected,
+        "status_codes": {str(code): n for code, n in sorted(statuses.items())},
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "throughput_rps": len(latencies) / wall if wall else 0.0,
+        "db_calls_per_request": sum(db_calls.values()) / total if total else 0.0,
+        "rpc_calls_per_request": sum(rpc_calls.values()) / total if total else 0.0,
+        "db_calls": dict(db_calls),
+        "rpc_calls": dict(rpc_calls),
+    }
+
+
+def limiter_config() -> dict[str, Any]:
+    """Admission-control settings the app ran with, for the report."""
+    from config import get_settings
+
+    settings = get_settings()
+    if not settings.LIMITER_ENABLED:
+        return {"enabled": False}
+    prefixes = ("CLAIM_", "READ_", "WEBHOOK_")
+    return {
+        "enabled": True,
+        **{
+            name.lower(): getattr(settings, name)
+            for name in dir(settings)
+            if name.startswith(prefixes) or name.endswith("_LATENCY_TARGET")
+        },
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_anvil() -> tuple[subprocess.Popen, str] | None:
+    """Start a local anvil node with Base Sepolia's chain ID, if anvil is installed."""
+    if shutil.which("anvil") is None:
+        return None
+    port = _free_port()
+    proc = subprocess.Popen(
+        ["anvil", "--port", str(port), "--chain-id", str(BASE_SEPOLIA_CHAIN_ID), "--silent"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        with socket.socket() as s:
+            if s.connect_ex(("127.0.0.1", port)) == 0:
+                return proc, f"http://127.0.0.1:{port}"
+        time.sleep(0.05)
+    proc.terminate()
+    raise TimeoutError("anvil did not start within 30s")
+
+
+async def run_benchmark(args: argparse.Namespace, rpc_enabled: bool) -> list[dict[str, Any]]:
+    # Imported here so the environment set up in main() is seen by config.
+    from main import app
+
+    counter = CallCounter()
+    # Unhandled server errors come back as 500s and count as errors instead of
+    # aborting the run.
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    results = []
+
+    fixtures = {
+        name: load_fixture(name)
+        for name in (
+            "pull_request_opened",
+            "pull_request_review_requested",
+            "pull_request_review_submitted",
+            "pull_request_closed",
+        )
+    }
+    prs = range(1, args.prs + 1)
+
+    def reviewer_for(pr_number: int) -> int:
+        return 10_000 + pr_number % args.users
+
+    def repo_for(pr_number: int) -> int:
+        return 500 + pr_number % args.repos
+
+    def approved(pr_number: int) -> bool:
+        # Every fifth PR is merged without approval, leaving an ineligible review.
+        return pr_number % 5 != 0
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as client:
+
+        def webhook(fixture: str, path: str, numbers: list[int]) -> Callable[[int], Awaitable[httpx.Response]]:
+            def send(i: int) -> Awaitable[httpx.Response]:
+                n = numbers[i]
+                return client.post(path, json=render_fixture(fixtures[fixture], n, reviewer_for(n), repo_for(n)))
+
+            return send
+
+        # Replay the PR lifecycle in stages so each PR's events stay ordered.
+        pr_path = "/webhooks/github/pull-request"
+        review_path = "/webhooks/github/pull-request-review"
+        stages = [
+            ("opened", pr_path, "pull_request_opened", list(prs)),
+            ("review_requested", pr_path, "pull_request_review_requested", list(prs)),
+            ("review_submitted", review_path, "pull_request_review_submitted", [n for n in prs if approved(n)]),
+            ("closed", pr_path, "pull_request_closed", list(prs)),
+        ]
+        for event, path, fixture, numbers in stages:
+            results.append(
+                await run_phase(
+                    f"POST {path} ({event})",
+                    webhook(fixture, path, numbers),
+                    len(numbers),
+                    args.concurrency,
+                    counter,
+                )
+            )
+
+        def get_prs(i: int) -> Awaitable[httpx.Response]:
+            return client.get("/getPRs", params={"user_id": str(10_000 + i % args.users)})
+
+        results.append(await run_phase("GET /getPRs", get_prs, args.requests, args.concurrency, counter))
+
+        def search_prs(i: int) -> Awaitable[httpx.Response]:
+            # Synthetic titles are "Synthetic PR #<n>", so a PR number is a selective query.
+            n = prs[i % len(prs)]
+            return client.get("/searchPRs", params={"user_id": str(reviewer_for(n)), "q": str(n)})
+
+        results.append(await run_phase("GET /searchPRs", search_prs, args.requests, args.concurrency, counter))
+
+        if rpc_enabled:
+            from services.crypto_payment import get_payment_service
+
+            from db import get_db
+
+            counter.attach_rpc(get_payment_service().w3)
+            # Webhooks were replayed concurrently, so PR ids don't follow PR numbers.
+            rows = get_db().table("pull_requests").select("id, url").execute().data
+            pr_ids = {row["url"]: row["id"] for row in rows}
+            claimable = [n for n in prs if approved(n)][: args.claims]
+
+            def claim_pr(i: int) -> Awaitable[httpx.Response]:
+                n = claimable[i]
+                return client.post(
+                    "/claimPR",
+                    json={
+                        "user_id": str(reviewer_for(n)),
+                        "pr_id": pr_ids[f"{repository_url(repo_for(n))}/pull/{n}"],
+                        "wallet_address": RECIPIENT_ADDRESS,
+                    },
+                )
+
+            results.append(await run_phase("POST /claimPR", claim_pr, len(claimable), args.concurrency, counter))
+
+    return results
+
+
+def compare(results: list[dict[str, Any]], baseline_path: Path) -> None:
+    baseline = {r["endpoint"]: r for r in json.loads(baseline_path.read_text())["results"]}
+    print(f"\nvs {baseline_path}")
+    print(f"{'endpoint':<58} {'p95 Δ%':>8} {'rps Δ%':>8}")
+    for r in results:
+        base = baseline.get(r["endpoint"])
+        if base is None:
+            continue
+        p95 = (r["p95_ms"] - base["p95_ms"]) / base["p95_ms"] * 100 if base["p95_ms"] else 0.0
+        rps = (r["throughput_rps"] - base["throughput_rps"]) / base["throughput_rps"] * 100 if base["throughput_rps"] else 0.0
+        print(f"{r['endpoint']:<58} {p95:>+8.1f} {rps:>+8.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=50, help="Number of synthetic reviewers")
+    parser.add_argument("--prs", type=int, default=500, help="Number of synthetic pull requests")
+    parser.add_argument("--repos", type=int, default=10, help="Number of repositories the PRs are spread over")
+    parser.add_argument("--requests", type=int, default=1000, help="Requests for each of the /getPRs and /searchPRs phases")
+    parser.add_argument("--claims", type=int, default=50, help="Maximum claims to submit")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rpc-url", help="Use an already running dev node instead of starting anvil")
+    parser.add_argument("--wallet-key", default=ANVIL_PRIVATE_KEY, help="Funded key on the dev node")
+    parser.add_argument("--no-claims", action="store_true", help="Skip the claim phase")
+    parser.add_argument(
+        "--limiter",
+        action="store_true",
+        help="Keep admission control on (off by default so runs measure the endpoints, not load shedding)",
+    )
+    parser.add_argument("--output", type=Path, help="Write JSON results to this file")
+    parser.add_argument("--compare", type=Path, help="Baseline JSON results to diff against")
+    args = parser.parse_args()
+
+    anvil = None
+    rpc_url = args.rpc_url
+    if not args.no_claims and rpc_url is None:
+        started = start_anvil()
+        if started is None:
+            print("anvil not found on PATH; skipping the claim phase", file=sys.stderr)
+        else:
+            anvil, rpc_url = started
+
+    os.environ["DB_BACKEND"] = "local"
+    os.environ["LIMITER_ENABLED"] = "true" if args.limiter else "false"
+    if rpc_url:
+        os.environ["BASE_SEPOLIA_RPC_URL"] = rpc_url
+        os.environ["WALLET_PRIVATE_KEY"] = args.wallet_key
+
+    try:
+        results = asyncio.run(run_benchmark(args, rpc_enabled=bool(rpc_url) and not args.no_claims))
+    finally:
+        if anvil is not None:
+            anvil.terminate()
+            anvil.wait()
+
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            **{k: v for k, v in vars(args).items() if k not in ("wallet_key", "output", "compare")},
+            "limiter": limiter_config(),
+        },
+        "results": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2, default=str))
+
+    print(
+        f"{'endpoint':<58} {'p50':>8} {'p95':>8} {'p99':>8} {'rps':>8} {'db/req':>7} {'rpc/req':>7} "
+        f"{'err':>5} {'429':>5}"
+    )
+    for r in results:
+        print(
+            f"{r['endpoint']:<58} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} "
+            f"{r['throughput_rps']:>8.1f} {r['db_calls_per_request']:>7.2f} {r['rpc_calls_per_request']:>7.2f} "
+            f"{r['errors']:>5} {r['rejected_429']:>5}"
+        )
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,8 @@ load_dotenv()
 class Settings:
     SUPABASE_URL: str = os.getenv("SUPABASE_URL", "")
     SUPABASE_SERVICE_KEY: str = os.getenv("SUPABASE_SERVICE_KEY", "")
+    # "supabase", or "local" for the in-memory stand-in in local_db.py
+    DB_BACKEND: str = os.getenv("DB_BACKEND", "supabase")
 
     # Crypto payment configuration (Base Sepolia)
     WALLET_PRIVATE_KEY: str = os.getenv("WALLET_PRIVATE_KEY", "")
@@ -16,6 +18,36 @@ class Settings:
 
     CORS_ORIGINS: list[str] = ["*"]
 
+    # Startup: open the DB / RPC connections before the first request is served
+    PREWARM_DB: bool = os.getenv("PREWARM_DB", "false").lower() == "true"
+    PREWARM_RPC: bool = os.getenv("PREWARM_RPC", "false").lower() == "true"
+
+    # Prometheus-format /metrics endpoint and hot-path instrumentation
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+    # Admission control (see limiter.py). Claim and read pools start at the base
+    # limit and adapt up to the max from the DB/RPC latency their own requests
+    # see; the webhook pool is a fixed reserved budget. Claims + reads at max
+    # stay below the default threadpool size (40) used for sync routes.
+    LIMITER_ENABLED: bool = os.getenv("LIMITER_ENABLED", "true").lower() == "true"
+    CLAIM_CONCURRENCY: int = int(os.getenv("CLAIM_CONCURRENCY", "4"))
+    CLAIM_CONCURRENCY_MAX: int = int(os.getenv("CLAIM_CONCURRENCY_MAX", "16"))
+    CLAIM_QUEUE_SIZE: int = int(os.getenv("CLAIM_QUEUE_SIZE", "32"))
+    CLAIM_QUEUE_TIMEOUT: float = float(os.getenv("CLAIM_QUEUE_TIMEOUT", "10"))
+    READ_CONCURRENCY: int = int(os.getenv("READ_CONCURRENCY", "8"))
+    READ_CONCURRENCY_MAX: int = int(os.getenv("READ_CONCURRENCY_MAX", "16"))
+    READ_QUEUE_SIZE: int = int(os.getenv("READ_QUEUE_SIZE", "64"))
+    READ_QUEUE_TIMEOUT: float = float(os.getenv("READ_QUEUE_TIMEOUT", "5"))
+    WEBHOOK_CONCURRENCY: int = int(os.getenv("WEBHOOK_CONCURRENCY", "8"))
+    WEBHOOK_QUEUE_SIZE: int = int(os.getenv("WEBHOOK_QUEUE_SIZE", "128"))
+    WEBHOOK_QUEUE_TIMEOUT: float = float(os.getenv("WEBHOOK_QUEUE_TIMEOUT", "8"))
+    DB_LATENCY_TARGET: float = float(os.getenv("DB_LATENCY_TARGET", "0.5"))
+    RPC_LATENCY_TARGET: float = float(os.getenv("RPC_LATENCY_TARGET", "1.0"))
+
+    # The limiter adapts from the DB/RPC timings, so they are recorded whenever
+    # either feature is on, even with the /metrics endpoint disabled.
+    INSTRUMENT_BACKENDS: bool = METRICS_ENABLED or LIMITER_ENABLED
+
 
 @lru_cache
 def get_settings() -> Settings:
@@ -1,18 +1,39 @@
-from supabase import create_client, Client
+from typing import TYPE_CHECKING, Any, cast
 
 from config import get_settings
 
-_client: Client | None = None
+if TYPE_CHECKING:
+    from supabase import Client
 
+_client: "Client | None" = None
 
-def get_db() -> Client:
+
+def get_db() -> "Client":
     global _client
     if _client is None:
         settings = get_settings()
+        if settings.DB_BACKEND == "local":
+            from local_db import LocalClient
+
+            _client = _instrument(LocalClient())
+            return _client
+
+        # Imported lazily: the supabase stack is only needed once a request
+        # actually touches the database.
+        from supabase import create_client
+
         if not settings.SUPABASE_URL or not settings.SUPABASE_SERVICE_KEY:
             raise ValueError(
                 "Supabase credentials not configured. "
                 "Set SUPABASE_URL and SUPABASE_SERVICE_KEY in .env"
             )
-        _client = create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_KEY)
+        _client = _instrument(create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_KEY))
     return _client
+
+
+def _instrument(client: Any) -> "Client":
+    if get_settings().INSTRUMENT_BACKENDS:
+        from metrics import InstrumentedClient
+
+        client = InstrumentedClient(client)
+    return cast("Client", client)
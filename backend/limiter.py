@@ -0,0 +1,263 @@
+"""
+Admission control: per-route concurrency pools with bounded wait queues.
+
+Each pool admits up to `limit` requests at once and parks up to `max_queue` more
+in FIFO order. When the queue is full the request is rejected with 429, and if a
+queued request is not admitted within `queue_timeout` it gets 503; both carry a
+Retry-After header. Adaptive pools resize their limit AIMD-style from the DB and
+RPC latencies recorded by the metrics layer while serving their own requests:
++1 per window of fast samples taken while the pool is saturated, multiplicative
+decrease when a sample exceeds its latency target.
+"""
+import asyncio
+import contextvars
+import json
+import math
+import threading
+import time
+from collections import deque
+
+from config import Settings
+from metrics import (
+    CONCURRENCY_IN_FLIGHT,
+    CONCURRENCY_LIMIT,
+    DB_QUERY_LATENCY,
+    QUEUE_DEPTH,
+    REJECTED_REQUESTS,
+    RPC_LATENCY,
+)
+
+# Pool of the request being served, so downstream latency is attributed to it.
+# Sync routes run in the threadpool with a copy of the context, so it is visible there too.
+_current_pool: contextvars.ContextVar["AdaptiveLimiter | None"] = contextvars.ContextVar(
+    "current_pool", default=None
+)
+
+
+class Saturated(Exception):
+    """Raised when a pool cannot admit a request."""
+
+    def __init__(self, status_code: int, retry_after: int):
+        super().__init__(f"Concurrency limit reached (HTTP {status_code})")
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit with a bounded FIFO wait queue.
+
+    acquire()/release() must be called from the event loop; observe() may be
+    called from any thread.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial_limit: int,
+        max_queue: int,
+        queue_timeout: float,
+        min_limit: int = 1,
+        max_limit: int | None = None,
+        adaptive: bool = True,
+        backoff: float = 0.75,
+        decrease_interval: float = 1.0,
+    ):
+        self.name = name
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit or initial_limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.adaptive = adaptive
+        self.backoff = backoff
+        self.decrease_interval = decrease_interval
+
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._lock = threading.Lock()
+        self._last_decrease = 0.0
+        # Smoothed time a request holds a slot, used for Retry-After.
+        self._service_time = 1.0
+
+        CONCURRENCY_LIMIT.set(self.limit, name)
+
+    async def acquire(self) -> None:
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self._admit()
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            REJECTED_REQUESTS.inc(self.name, "429")
+            raise Saturated(429, self.retry_after())
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        QUEUE_DEPTH.set(len(self._waiters), self.name)
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                # A slot was handed over just as we gave up on it.
+                self.release()
+            else:
+                future.cancel()
+                if future in self._waiters:
+                    self._waiters.remove(future)
+            QUEUE_DEPTH.set(len(self._waiters), self.name)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            REJECTED_REQUESTS.inc(self.name, "503")
+            raise Saturated(503, self.retry_after())
+
+    def release(self, service_time: float | None = None) -> None:
+        self.in_flight -= 1
+        CONCURRENCY_IN_FLIGHT.dec(self.name)
+        if service_time is not None:
+            self._service_time = 0.8 * self._service_time + 0.2 * service_time
+        self._wake()
+
+    def observe(self, latency: float, target: float) -> None:
+        """Feed a downstream latency sample and adjust the limit."""
+        if not self.adaptive:
+            return
+        with self._lock:
+            if latency > target:
+                now = time.monotonic()
+                # One decrease per interval, so a burst of slow calls doesn't collapse the limit.
+                if now - self._last_decrease < self.decrease_interval:
+                    return
+                self._last_decrease = now
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+            elif self.in_flight >= int(self.limit):
+                # Only grow while the limit is actually binding; otherwise quiet
+                # traffic would drift it up to max_limit.
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            else:
+                return
+            CONCURRENCY_LIMIT.set(self.limit, self.name)
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely to free up for a new request."""
+        backlog = len(self._waiters) + 1
+        return max(1, math.ceil(self._service_time * backlog / max(1, int(self.limit))))
+
+    def _admit(self) -> None:
+        self.in_flight += 1
+        CONCURRENCY_IN_FLIGHT.inc(self.name)
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < int(self.limit):
+            future = self._waiters.popleft()
+            if future.done():
+                continue
+            self._admit()
+            future.set_result(None)
+        QUEUE_DEPTH.set(len(self._waiters), self.name)
+
+
+class ConcurrencyLimitMiddleware:
+    """ASGI middleware routing requests to a pool by path prefix.
+
+    Paths that match no pool (/, /metrics, docs) are never limited.
+    """
+
+    def __init__(self, app, pools: list[tuple[str, AdaptiveLimiter]]):
+        self.app = app
+        self.pools = pools
+
+    async def __call__(self, scope, receive, send):
+        limiter = self._pool_for(scope)
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await limiter.acquire()
+        except Saturated as e:
+            await _reject(send, e)
+            return
+
+        token = _current_pool.set(limiter)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release(time.perf_counter() - start)
+            _current_pool.reset(token)
+
+    def _pool_for(self, scope) -> AdaptiveLimiter | None:
+        if scope["type"] != "http":
+            return None
+        for prefix, limiter in self.pools:
+            if scope["path"].startswith(prefix):
+                return limiter
+        return None
+
+
+async def _reject(send, error: Saturated) -> None:
+    body = json.dumps(
+        {"error": "Server busy", "detail": f"Retry after {error.retry_after}s"}
+    ).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": error.status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(error.retry_after).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+def build_pools(settings: Settings) -> list[tuple[str, AdaptiveLimiter]]:
+    """Create the per-route pools and subscribe them to DB/RPC latency.
+
+    Each sample goes to the pool of the request that made the call, so e.g.
+    webhook and read traffic never moves the claim limit.
+    """
+    claims = AdaptiveLimiter(
+        "claims",
+        initial_limit=settings.CLAIM_CONCURRENCY,
+        max_limit=settings.CLAIM_CONCURRENCY_MAX,
+        max_queue=settings.CLAIM_QUEUE_SIZE,
+        queue_timeout=settings.CLAIM_QUEUE_TIMEOUT,
+    )
+    reads = AdaptiveLimiter(
+        "reads",
+        initial_limit=settings.READ_CONCURRENCY,
+        max_limit=settings.READ_CONCURRENCY_MAX,
+        max_queue=settings.READ_QUEUE_SIZE,
+        queue_timeout=settings.READ_QUEUE_TIMEOUT,
+    )
+    # Reserved budget: claim load never eats into webhook slots, and the limit
+    # stays fixed so GitHub deliveries keep being acknowledged.
+    webhooks = AdaptiveLimiter(
+        "webhooks",
+        initial_limit=settings.WEBHOOK_CONCURRENCY,
+        max_queue=settings.WEBHOOK_QUEUE_SIZE,
+        queue_timeout=settings.WEBHOOK_QUEUE_TIMEOUT,
+        adaptive=False,
+    )
+
+    def on_db_latency(seconds: float, *_labels: str) -> None:
+        pool = _current_pool.get()
+        if pool is not None:
+            pool.observe(seconds, settings.DB_LATENCY_TARGET)
+
+    def on_rpc_latency(seconds: float, *_labels: str) -> None:
+        pool = _current_pool.get()
+        if pool is not None:
+            pool.observe(seconds, settings.RPC_LATENCY_TARGET)
+
+    DB_QUERY_LATENCY.subscribe(on_db_latency)
+    RPC_LATENCY.subscribe(on_rpc_latency)
+
+    return [
+        ("/claimPR", claims),
+        ("/webhooks/", webhooks),
+        ("/getPRs", reads),
+        ("/searchPRs", reads),
+    ]
@@ -0,0 +1,514 @@
+"""
+In-process stand-in for the Supabase client, used by benchmarks and local runs.
+
+Implements the subset of the supabase-py / postgrest query builder that the app
+uses (select with one level of embedding, insert, upsert, update, delete, eq,
+neq, in_, order, limit, and the search_user_prs RPC) over in-memory tables that
+mirror supabase_schema.sql. Enable it with DB_BACKEND=local.
+"""
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+
+class LocalDBError(Exception):
+    """Raised for constraint violations, mirroring PostgREST API errors."""
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+# table -> (primary key, serial primary key?, unique constraints, indexed columns, column defaults)
+_SCHEMA: dict[str, dict[str, Any]] = {
+    "repositories": {
+        "pk": "id",
+        "serial": False,
+        "unique": [("id",)],
+        "indexed": [],
+        "defaults": {"private": lambda: False, "archived_at": lambda: None, "created_at": _now},
+    },
+    "users": {
+        "pk": "github_user_id",
+        "serial": False,
+        "unique": [("github_user_id",)],
+        "indexed": [],
+        "defaults": {"username": lambda: None, "created_at": _now},
+    },
+    "pull_requests": {
+        "pk": "id",
+        "serial": True,
+        "unique": [("id",), ("url",)],
+        "indexed": ["repo_id"],
+        "defaults": {"body": lambda: None, "created_at": _now},
+    },
+    "user_pr_reviews": {
+        "pk": "id",
+        "serial": True,
+        "unique": [("id",), ("repo_id", "user_id", "pr_id")],
+        "indexed": ["repo_id", "user_id", "pr_id"],
+        "defaults": {"status": lambda: "requested", "payout": lambda: 0.0, "timestamp": _now},
+    },
+}
+
+# (table, embedded table) -> (local column, referenced column)
+_FOREIGN_KEYS: dict[tuple[str, str], tuple[str, str]] = {
+    ("user_pr_reviews", "pull_requests"): ("pr_id", "id"),
+    ("user_pr_reviews", "users"): ("user_id", "github_user_id"),
+    ("user_pr_reviews", "repositories"): ("repo_id", "id"),
+    ("pull_requests", "repositories"): ("repo_id", "id"),
+}
+
+
+# Postgres' english stopword list, trimmed to the words common in PR text.
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were will with".split()
+)
+# Match ts_rank's default weights for the A (title) and B (body) sections.
+_TITLE_WEIGHT = 1.0
+_BODY_WEIGHT = 0.4
+
+
+def stem(word: str) -> str:
+    """Strip common English inflections so "tokens"/"token" and "tests"/"testing"/"test" meet.
+
+    A light approximation of the Snowball stemmer behind to_tsvector('english'):
+    plurals, -ing and -ed only, keeping at least three characters of stem.
+    """
+    if word.endswith("sses"):
+        return word[:-2]
+    if word.endswith("ies") and len(word) > 4:
+        return word[:-3] + "y"
+    if word.endswith(("xes", "ches", "shes")):
+        return word[:-2]
+    for suffix in ("ing", "ed"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[: -len(suffix)]
+            # fixing -> fix, but running -> run
+            if len(word) > 3 and word[-1] == word[-2] and word[-1] not in "lsz":
+                word = word[:-1]
+            return word
+    if word.endswith("s") and not word.endswith(("ss", "us", "is")) and len(word) > 3:
+        return word[:-1]
+    return word
+
+
+def tokenize(text: str | None) -> list[str]:
+    """Lowercase, stemmed word tokens without stopwords; a rough stand-in for to_tsvector."""
+    return [stem(t) for t in re.findall(r"[a-z0-9]+", (text or "").lower()) if t not in _STOPWORDS]
+
+
+# A possibly negated quoted phrase or bare word, as websearch_to_tsquery splits its input.
+_QUERY_TOKEN = re.compile(r'(-?)(?:"([^"]*)"?|([^\s"]+))')
+
+
+def parse_websearch(query: str) -> list[tuple[set[str], list[set[str]]]]:
+    """Parse websearch_to_tsquery syntax into OR-ed clauses of (required, excluded).
+
+    Words are AND-ed, `or` separates alternatives and `-word` excludes a word.
+    Quoted phrases are matched as all of their words rather than in sequence,
+    and `-"a phrase"` excludes documents containing all of its words.
+    """
+    clauses: list[tuple[set[str], list[set[str]]]] = [(set(), [])]
+    for negated, phrase, word in _QUERY_TOKEN.findall(query.lower()):
+        if word == "or" and not negated:
+            clauses.append((set(), []))
+            continue
+        terms = set(tokenize(phrase or word))
+        if not terms:
+            continue
+        required, excluded = clauses[-1]
+        if negated:
+            excluded.append(terms)
+        else:
+            required |= terms
+    return [clause for clause in clauses if clause[0] or clause[1]]
+
+
+class InvertedIndex:
+    """Token -> {pr_id: weighted term frequency} over pull request titles and bodies."""
+
+    def __init__(self):
+        self._postings: dict[str, dict[int, float]] = defaultdict(dict)
+        self._documents: dict[int, Counter[str]] = {}
+
+    def add(self, pr_id: int, title: str | None, body: str | None) -> None:
+        self.remove(pr_id)
+        weights: Counter[str] = Counter()
+        for token in tokenize(title):
+            weights[token] += _TITLE_WEIGHT
+        for token in tokenize(body):
+            weights[token] += _BODY_WEIGHT
+        self._documents[pr_id] = weights
+        for token, weight in weights.items():
+            self._postings[token][pr_id] = weight
+
+    def remove(self, pr_id: int) -> None:
+        for token in self._documents.pop(pr_id, ()):
+            postings = self._postings[token]
+            postings.pop(pr_id, None)
+            if not postings:
+                del self._postings[token]
+
+    def rank(self, query: str, pr_ids: set[int]) -> dict[int, float]:
+        """Score the PRs in `pr_ids` that match `query` (see parse_websearch)."""
+        clauses = parse_websearch(query)
+        if not clauses:
+            return {}
+        if all(required for required, _ in clauses):
+            # Only PRs holding each clause's rarest term can match; walk whichever
+            # side is smaller, the user's PRs or those postings.
+            candidates: set[int] = set()
+            for required, _ in clauses:
+                rarest = min((self._postings.get(t, {}) for t in required), key=len)
+                candidates |= pr_ids if len(pr_ids) < len(rarest) else pr_ids.intersection(rarest)
+        else:
+            candidates = pr_ids
+        terms = set().union(*(required for required, _ in clauses))
+        total = max(1, len(self._documents))
+        scores = {}
+        for pr_id in candidates:
+            document = self._documents.get(pr_id)
+            if pr_id not in pr_ids or document is None:
+                continue
+            if not any(
+                required <= document.keys() and not any(phrase <= document.keys() for phrase in excluded)
+                for required, excluded in clauses
+            ):
+                continue
+            scores[pr_id] = sum(
+                (document[t] * math.log(1 + total / len(self._postings[t])) for t in terms if t in document), 0.0
+            )
+        return scores
+
+
+class LocalResponse:
+    def __init__(self, data: list[dict[str, Any]]):
+        self.data = data
+
+
+def _split_columns(columns: str) -> list[str]:
+    """Split a select string on top-level commas."""
+    parts, depth, current = [], 0, ""
+    for char in columns:
+        if char == "," and depth == 0:
+            parts.append(current.strip())
+            current = ""
+            continue
+        depth += char == "("
+        depth -= char == ")"
+        current += char
+    if current.strip():
+        parts.append(current.strip())
+    return parts
+
+
+class LocalQuery:
+    def __init__(self, client: "LocalClient", table: str):
+        if table not in _SCHEMA:
+            raise LocalDBError(f"relation \"{table}\" does not exist")
+        self._client = client
+        self._table = table
+        self._op = "select"
+        self._columns = "*"
+        self._payload: list[dict[str, Any]] | dict[str, Any] = []
+        self._on_conflict: tuple[str, ...] = ()
+        self._ignore_duplicates = False
+        self._filters: list[Callable[[dict[str, Any]], bool]] = []
+        self._eq_filters: list[tuple[str, Any]] = []
+        self._order: tuple[str, bool] | None = None
+        self._limit: int | None = None
+
+    # Operations
+
+    def select(self, columns: str = "*") -> "LocalQuery":
+        self._op = "select"
+        self._columns = columns
+        return self
+
+    def insert(self, rows: dict[str, Any] | list[dict[str, Any]]) -> "LocalQuery":
+        self._op = "insert"
+        self._payload = rows if isinstance(rows, list) else [rows]
+        return self
+
+    def upsert(
+        self,
+        rows: dict[str, Any] | list[dict[str, Any]],
+        on_conflict: str = "",
+        ignore_duplicates: bool = False,
+    ) -> "LocalQuery":
+        self._op = "upsert"
+        self._payload = rows if isinstance(rows, list) else [rows]
+        conflict = on_conflict or _SCHEMA[self._table]["pk"]
+        self._on_conflict = tuple(c.strip() for c in conflict.split(","))
+        self._ignore_duplicates = ignore_duplicates
+        return self
+
+    def update(self, values: dict[str, Any]) -> "LocalQuery":
+        self._op = "update"
+        self._payload = values
+        return self
+
+    def delete(self) -> "LocalQuery":
+        self._op = "delete"
+        return self
+
+    # Filters and modifiers
+
+    def eq(self, column: str, value: Any) -> "LocalQuery":
+        self._filters.append(lambda row: str(row.get(column)) == str(value))
+        self._eq_filters.append((column, value))
+        return self
+
+    def neq(self, column: str, value: Any) -> "LocalQuery":
+        self._filters.append(lambda row: str(row.get(column)) != str(value))
+        return self
+
+    def in_(self, column: str, values: list[Any]) -> "LocalQuery":
+        wanted = {str(v) for v in values}
+        self._filters.append(lambda row: str(row.get(column)) in wanted)
+        return self
+
+    def order(self, column: str, desc: bool = False) -> "LocalQuery":
+        self._order = (column, desc)
+        return self
+
+    def limit(self, size: int) -> "LocalQuery":
+        self._limit = size
+        return self
+
+    def execute(self) -> LocalResponse:
+        with self._client._lock:
+            self._client.stats[(self._table, self._op)] += 1
+            match self._op:
+                case "select":
+                    data = self._select()
+                case "insert":
+                    data = [self._client._insert(self._table, row) for row in self._payload]
+                case "upsert":
+                    upserted = (
+                        self._client._upsert(self._table, row, self._on_conflict, self._ignore_duplicates)
+                        for row in self._payload
+                    )
+                    data = [row for row in upserted if row is not None]
+                case "update":
+                    data = self._update()
+                case _:
+                    data = self._delete()
+        return LocalResponse(data)
+
+    def _matching(self) -> list[dict[str, Any]]:
+        candidates = self._client._candidates(self._table, self._eq_filters)
+        rows = [row for row in candidates if all(f(row) for f in self._filters)]
+        if self._order:
+            column, desc = self._order
+            rows.sort(key=lambda row: row.get(column), reverse=desc)
+        if self._limit is not None:
+            rows = rows[: self._limit]
+        return rows
+
+    def _select(self) -> list[dict[str, Any]]:
+        return [self._client._project(self._table, row, self._columns) for row in self._matching()]
+
+    def _update(self) -> list[dict[str, Any]]:
+        assert isinstance(self._payload, dict)
+        rows = self._matching()
+        for row in rows:
+            self._client._update_row(self._table, row, self._payload)
+        return [dict(row) for row in rows]
+
+    def _delete(self) -> list[dict[str, Any]]:
+        rows = self._matching()
+        for row in rows:
+            self._client._delete_row(self._table, row)
+        return [dict(row) for row in rows]
+
+
+class LocalRPC:
+    def __init__(self, client: "LocalClient", function: str, params: dict[str, Any]):
+        if function not in client._functions:
+            raise LocalDBError(f"function {function} does not exist")
+        self._client = client
+        self._function = function
+        self._params = params
+
+    def execute(self) -> LocalResponse:
+        with self._client._lock:
+            self._client.stats[(self._function, "rpc")] += 1
+            return LocalResponse(self._client._functions[self._function](**self._params))
+
+
+class LocalClient:
+    """Thread-safe in-memory replacement for `supabase.Client`."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._tables: dict[str, list[dict[str, Any]]] = {name: [] for name in _SCHEMA}
+        # table -> unique columns -> key -> row
+        self._indexes: dict[str, dict[tuple[str, ...], dict[tuple[str, ...], dict[str, Any]]]] = {
+            name: {columns: {} for columns in schema["unique"]} for name, schema in _SCHEMA.items()
+        }
+        # table -> indexed column -> value -> {id(row): row}
+        self._lookups: dict[str, dict[str, dict[str, dict[int, dict[str, Any]]]]] = {
+            name: {column: defaultdict(dict) for column in schema["indexed"]} for name, schema in _SCHEMA.items()
+        }
+        self._search = InvertedIndex()
+        self._functions: dict[str, Callable[..., list[dict[str, Any]]]] = {
+            "search_user_prs": self._search_user_prs,
+            "archive_repository": self._archive_repository,
+        }
+        self._serials: Counter[str] = Counter()
+        # Number of executed queries by (table, operation)
+        self.stats: Counter[tuple[str, str]] = Counter()
+
+    def table(self, name: str) -> LocalQuery:
+        return LocalQuery(self, name)
+
+    def rpc(self, function: str, params: dict[str, Any] | None = None) -> LocalRPC:
+        return LocalRPC(self, function, params or {})
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.stats.clear()
+
+    def _find(self, table: str, columns: tuple[str, ...], row: dict[str, Any]) -> dict[str, Any] | None:
+        index = self._indexes[table].get(columns)
+        if index is not None:
+            return index.get(tuple(str(row.get(c)) for c in columns))
+        for existing in self._tables[table]:
+            if all(str(existing.get(c)) == str(row.get(c)) for c in columns):
+                return existing
+        return None
+
+    def _candidates(self, table: str, eq_filters: list[tuple[str, Any]]) -> list[dict[str, Any]]:
+        """Rows that may match, narrowed by an index on one of the eq filters."""
+        for column, value in eq_filters:
+            if column in self._lookups[table]:
+                return list(self._lookups[table][column].get(str(value), {}).values())
+        return self._tables[table]
+
+    def _insert(self, table: str, row: dict[str, Any]) -> dict[str, Any]:
+        schema = _SCHEMA[table]
+        new_row = {column: default() for column, default in schema["defaults"].items()}
+        new_row.update(row)
+        if schema["serial"] and schema["pk"] not in row:
+            self._serials[table] += 1
+            new_row[schema["pk"]] = self._serials[table]
+        for columns in schema["unique"]:
+            if self._find(table, columns, new_row) is not None:
+                raise LocalDBError(
+                    f"duplicate key value violates unique constraint on {table}({', '.join(columns)})"
+                )
+        self._tables[table].append(new_row)
+        self._index_row(table, new_row)
+        return dict(new_row)
+
+    def _upsert(
+        self, table: str, row: dict[str, Any], on_conflict: tuple[str, ...], ignore_duplicates: bool = False
+    ) -> dict[str, Any] | None:
+        existing = self._find(table, on_conflict, row)
+        if existing is None:
+            return self._insert(table, row)
+        if ignore_duplicates:
+            # ON CONFLICT DO NOTHING returns no row for the conflicting input
+            return None
+        self._update_row(table, existing, row)
+        return dict(existing)
+
+    def _update_row(self, table: str, row: dict[str, Any], values: dict[str, Any]) -> None:
+        self._unindex_row(table, row)
+        row.update(values)
+        self._index_row(table, row)
+
+    def _delete_row(self, table: str, row: dict[str, Any]) -> None:
+        self._unindex_row(table, row)
+        self._tables[table] = [r for r in self._tables[table] if r is not row]
+
+    def _index_row(self, table: str, row: dict[str, Any]) -> None:
+        for columns, index in self._indexes[table].items():
+            index[tuple(str(row.get(c)) for c in columns)] = row
+        for column, lookup in self._lookups[table].items():
+            lookup[str(row.get(column))][id(row)] = row
+        if table == "pull_requests":
+            self._search.add(row["id"], row.get("title"), row.get("body"))
+
+    def _unindex_row(self, table: str, row: dict[str, Any]) -> None:
+        for columns, index in self._indexes[table].items():
+            index.pop(tuple(str(row.get(c)) for c in columns), None)
+        for column, lookup in self._lookups[table].items():
+            lookup[str(row.get(column))].pop(id(row), None)
+        if table == "pull_requests":
+            self._search.remove(row["id"])
+
+    def _search_user_prs(
+        self,
+        p_user_id: str,
+        p_query: str,
+        p_status: str | None = None,
+        p_limit: int = 20,
+        p_repo_id: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """Mirror of the search_user_prs SQL function in supabase_schema.sql.
+
+        Query syntax follows websearch_to_tsquery except that quoted phrases
+        match their words in any order; see parse_websearch. Words are reduced
+        by the light stem() rather than Snowball, so some inflections that
+        Postgres conflates (e.g. "merged"/"merges") still differ here.
+        """
+        reviews = {
+            review["pr_id"]: review
+            for review in self._lookups["user_pr_reviews"]["user_id"].get(str(p_user_id), {}).values()
+            if (p_status is None or review["status"] == p_status)
+            and (p_repo_id is None or str(review["repo_id"]) == str(p_repo_id))
+        }
+        scores = self._search.rank(p_query, set(reviews))
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:p_limit]
+        results = []
+        for pr_id, score in ranked:
+            pr = self._indexes["pull_requests"][("id",)][(str(pr_id),)]
+            review = reviews[pr_id]
+            results.append(
+                {
+                    "pr_id": pr["id"],
+                    "pr_title": pr["title"],
+                    "pr_body": pr["body"],
+                    "pr_url": pr["url"],
+                    "pr_created_at": pr["created_at"],
+                    "review_id": review["id"],
+                    "repo_id": review["repo_id"],
+                    "user_id": review["user_id"],
+                    "status": review["status"],
+                    "payout": review["payout"],
+                    "review_timestamp": review["timestamp"],
+                    "rank": score,
+                }
+            )
+        return results
+
+    def _project(self, table: str, row: dict[str, Any], columns: str) -> dict[str, Any]:
+        result: dict[str, Any] = {}
+        for column in _split_columns(columns):
+            if column == "*":
+                result.update(row)
+            elif "(" in column:
+                embedded, inner = column[:-1].split("(", 1)
+                embedded = embedded.strip()
+                local, remote = _FOREIGN_KEYS[(table, embedded)]
+                target = self._find(embedded, (remote,), {remote: row.get(local)})
+                result[embedded] = self._project(embedded, target, inner) if target else None
+            else:
+                result[column] = row.get(column)
+        return result
+
+    def _archive_repository(self, p_repo_id: int) -> list[dict[str, Any]]:
+        """Mirror of archive_repository: the detached partition's rows leave the table."""
+        repo = self._indexes["repositories"][("id",)].get((str(p_repo_id),))
+        if repo is None:
+            return []
+        self._update_row("repositories", repo, {"archived_at": _now()})
+        for review in list(self._lookups["user_pr_reviews"]["repo_id"].get(str(p_repo_id), {}).values()):
+            self._delete_row("user_pr_reviews", review)
+        return []
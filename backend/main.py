@@ -1,12 +1,60 @@
+import logging
+import time
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 
 from config import get_settings
-from routers import webhooks_router, reviews_router
+from db import get_db
+from limiter import ConcurrencyLimitMiddleware, build_pools
+from metrics import MetricsMiddleware
+from routers import webhooks_router, reviews_router, metrics_router
+
+logger = logging.getLogger(__name__)
+
+
+def _prewarm_db() -> None:
+    # Creating the client is cheap; a trivial query also opens the HTTP connection.
+    get_db().table("users").select("github_user_id").limit(1).execute()
+
+
+def _prewarm_rpc() -> None:
+    from services.crypto_payment import get_payment_service
+
+    get_payment_service()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    settings = get_settings()
+    start = time.perf_counter()
+
+    if settings.PREWARM_DB:
+        try:
+            await run_in_threadpool(_prewarm_db)
+        except Exception as e:
+            logger.warning(f"DB pre-warm failed: {e}")
+
+    if settings.PREWARM_RPC:
+        try:
+            await run_in_threadpool(_prewarm_rpc)
+        except Exception as e:
+            logger.warning(f"RPC pre-warm failed: {e}")
+
+    if settings.PREWARM_DB or settings.PREWARM_RPC:
+        logger.info("Pre-warm finished in %.1f ms", (time.perf_counter() - start) * 1000)
+
+    yield
+
 
-app = FastAPI(title="PRPay API", version="1.0.0")
+app = FastAPI(title="PRPay API", version="1.0.0", lifespan=lifespan)
 
 settings = get_settings()
+# Added first so it sits inside CORS and rejections still carry CORS headers.
+if settings.LIMITER_ENABLED:
+    app.add_middleware(ConcurrencyLimitMiddleware, pools=build_pools(settings))
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.CORS_ORIGINS,
@@ -14,9 +62,13 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
 
 app.include_router(webhooks_router)
 app.include_router(reviews_router)
+if settings.METRICS_ENABLED:
+    app.include_router(metrics_router)
 
 
 @app.get("/")
@@ -26,7 +78,9 @@ def root():
         "version": "1.0.0",
         "endpoints": {
             "GET /getPRs": "Get PR reviews for a user",
+            "GET /searchPRs": "Search a user's PR reviews by title and body",
             "POST /claimPR": "Claim a PR review",
             "POST /webhooks/github/pull-request": "GitHub webhook endpoint",
+            "GET /metrics": "Prometheus metrics",
         },
     }
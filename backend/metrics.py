@@ -0,0 +1,318 @@
+"""
+Lightweight Prometheus-format metrics for the hot paths.
+
+Counters, gauges and histograms are kept in-process behind a per-metric lock and
+rendered in the Prometheus text exposition format by the /metrics route.
+Recording a sample is a dict lookup, a bisect and two additions, so the
+instrumentation is cheap enough to leave on in production.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Callable, Iterator
+
+# Buckets in seconds, from fast DB lookups up to the 120s receipt timeout.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+REGISTRY: list["_Metric"] = []
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+        self._values: dict[tuple[str, ...], Any] = {}
+        REGISTRY.append(self)
+
+    def _key(self, labels: tuple[str, ...]) -> tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {labels}")
+        return tuple(str(label) for label in labels)
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items]
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class _ScalarMetric(_Metric):
+    """A single number per label set."""
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Counter(_ScalarMetric):
+    kind = "counter"
+
+
+class Gauge(_ScalarMetric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        if not labelnames:
+            self._values[()] = 0.0
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    @contextmanager
+    def track_inprogress(self, *labels: str) -> Iterator[None]:
+        """Increment while the block (or decorated function) runs."""
+        self.inc(*labels)
+        try:
+            yield
+        finally:
+            self.dec(*labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (last is +Inf), sum, count]
+        self._values: dict[tuple[str, ...], list[Any]] = {}
+        self._listeners: list[Callable[..., None]] = []
+
+    def subscribe(self, listener: Callable[..., None]) -> None:
+        """Call `listener(value, *labels)` for every observation."""
+        self._listeners.append(listener)
+
+    def observe(self, value: float, *labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+        for listener in self._listeners:
+            listener(value, *key)
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = [(k, list(v[0]), v[1], v[2]) for k, v in self._values.items()]
+        lines = []
+        for key, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, float("inf")), counts):
+                cumulative += bucket_count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {repr(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+def render_metrics() -> str:
+    return "\n".join(metric.render() for metric in REGISTRY) + "\n"
+
+
+# HTTP
+REQUEST_LATENCY = Histogram(
+    "prpay_http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ("method", "route", "status"),
+)
+
+# Supabase
+DB_QUERY_LATENCY = Histogram(
+    "prpay_db_query_duration_seconds",
+    "Supabase query latency by table and operation",
+    ("table", "operation"),
+)
+DB_QUERY_ERRORS = Counter(
+    "prpay_db_query_errors_total",
+    "Supabase queries that raised, by table and operation",
+    ("table", "operation"),
+)
+
+# web3
+RPC_LATENCY = Histogram(
+    "prpay_rpc_call_duration_seconds",
+    "JSON-RPC call latency by method",
+    ("method",),
+)
+RPC_ERRORS = Counter(
+    "prpay_rpc_errors_total",
+    "JSON-RPC calls that raised, by method",
+    ("method",),
+)
+RECEIPT_WAIT = Histogram(
+    "prpay_transaction_receipt_wait_seconds",
+    "Time spent waiting for a payment transaction receipt",
+)
+
+# Claims
+CLAIMS_IN_FLIGHT = Gauge("prpay_claims_in_flight", "Claim requests currently being processed")
+PENDING_TRANSACTIONS = Gauge("prpay_pending_transactions", "Payment transactions sent but not yet mined")
+
+# Admission control
+CONCURRENCY_LIMIT = Gauge("prpay_concurrency_limit", "Current concurrency limit by pool", ("pool",))
+CONCURRENCY_IN_FLIGHT = Gauge("prpay_concurrency_in_flight", "Admitted requests by pool", ("pool",))
+QUEUE_DEPTH = Gauge("prpay_queue_depth", "Requests waiting for a slot by pool", ("pool",))
+REJECTED_REQUESTS = Counter(
+    "prpay_rejected_requests_total",
+    "Requests shed by admission control, by pool and status code",
+    ("pool", "status"),
+)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency per route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUEST_LATENCY.observe(
+                time.perf_counter() - start, scope["method"], _route_template(scope), str(status)
+            )
+
+
+def _route_template(scope) -> str:
+    # Label by template rather than raw path to keep cardinality bounded. The
+    # router stores the matched route in the scope, so this runs after the app.
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class _InstrumentedQuery:
+    """Wraps a postgrest request builder and times its execute()."""
+
+    _OPERATIONS = frozenset({"select", "insert", "upsert", "update", "delete"})
+
+    def __init__(self, builder: Any, table: str, operation: str = "select"):
+        self._builder = builder
+        self._table = table
+        self._operation = operation
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._builder, name)
+        if not callable(attr):
+            return attr
+
+        def wrapper(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            if not hasattr(result, "execute"):
+                return result
+            operation = name if name in self._OPERATIONS else self._operation
+            return _InstrumentedQuery(result, self._table, operation)
+
+        return wrapper
+
+    def execute(self) -> Any:
+        start = time.perf_counter()
+        try:
+            return self._builder.execute()
+        except Exception:
+            DB_QUERY_ERRORS.inc(self._table, self._operation)
+            raise
+        finally:
+            DB_QUERY_LATENCY.observe(time.perf_counter() - start, self._table, self._operation)
+
+
+class InstrumentedClient:
+    """Proxy for a Supabase client that records timing for every query."""
+
+    def __init__(self, client: Any):
+        self._client = client
+
+    def table(self, name: str) -> _InstrumentedQuery:
+        return _InstrumentedQuery(self._client.table(name), name)
+
+    def rpc(self, function: str, params: dict[str, Any] | None = None, **kwargs: Any) -> _InstrumentedQuery:
+        return _InstrumentedQuery(self._client.rpc(function, params or {}, **kwargs), function, "rpc")
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+
+@lru_cache
+def rpc_metrics_middleware() -> type:
+    """Build the web3 middleware class lazily so web3 is only imported when needed."""
+    from web3.middleware import Web3Middleware
+
+    class RPCMetricsMiddleware(Web3Middleware):
+        def wrap_make_request(self, make_request):
+            def middleware(method, params):
+                start = time.perf_counter()
+                try:
+                    return make_request(method, params)
+                except Exception:
+                    RPC_ERRORS.inc(str(method))
+                    raise
+                finally:
+                    RPC_LATENCY.observe(time.perf_counter() - start, str(method))
+
+            return middleware
+
+    return RPCMetricsMiddleware
@@ -0,0 +1,45 @@
+-- Full-text search over pull request titles and bodies
+-- Run this in Supabase SQL Editor on databases created before /searchPRs
+
+ALTER TABLE pull_requests ADD COLUMN search_vector TSVECTOR GENERATED ALWAYS AS (
+    setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(body, '')), 'B')
+) STORED;
+
+CREATE INDEX idx_pull_requests_search ON pull_requests USING GIN (search_vector);
+
+-- Ranked full-text search over a user's reviewed PRs (called via PostgREST RPC)
+CREATE OR REPLACE FUNCTION search_user_prs(
+    p_user_id TEXT,
+    p_query TEXT,
+    p_status review_status DEFAULT NULL,
+    p_limit INTEGER DEFAULT 20
+)
+RETURNS TABLE (
+    pr_id INTEGER,
+    pr_title TEXT,
+    pr_body TEXT,
+    pr_url TEXT,
+    pr_created_at TIMESTAMPTZ,
+    review_id INTEGER,
+    user_id TEXT,
+    status review_status,
+    payout DECIMAL(10, 2),
+    review_timestamp TIMESTAMPTZ,
+    rank REAL
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT
+        pr.id, pr.title, pr.body, pr.url, pr.created_at,
+        r.id, r.user_id, r.status, r.payout, r.timestamp,
+        ts_rank(pr.search_vector, query) AS rank
+    FROM user_pr_reviews r
+    JOIN pull_requests pr ON pr.id = r.pr_id
+    CROSS JOIN websearch_to_tsquery('english', p_query) AS query
+    WHERE r.user_id = p_user_id
+      AND (p_status IS NULL OR r.status = p_status)
+      AND pr.search_vector @@ query
+    ORDER BY rank DESC, pr.created_at DESC
+    LIMIT p_limit;
+$$;
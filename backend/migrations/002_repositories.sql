@@ -0,0 +1,144 @@
+-- Repository-aware data model: repositories table, repo_id on pull_requests and
+-- user_pr_reviews, and user_pr_reviews list-partitioned by repository.
+-- Run this in Supabase SQL Editor on databases created before repository tracking.
+
+BEGIN;
+
+-- Repositories (GitHub repositories sending webhooks, keyed by GitHub repo ID)
+CREATE TABLE repositories (
+    id BIGINT PRIMARY KEY,
+    full_name TEXT NOT NULL,
+    html_url TEXT NOT NULL,
+    private BOOLEAN NOT NULL DEFAULT FALSE,
+    archived_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Existing rows predate repository tracking, so they are parked under placeholder
+-- repository 0. Webhook handlers never change an existing PR's repo_id and take
+-- the review's repo_id from the PR row, so those PRs can still gain reviewers and
+-- be approved and closed.
+INSERT INTO repositories (id, full_name, html_url) VALUES (0, 'legacy/unknown', '');
+
+ALTER TABLE pull_requests ADD COLUMN repo_id BIGINT REFERENCES repositories(id) ON DELETE CASCADE;
+UPDATE pull_requests SET repo_id = 0;
+ALTER TABLE pull_requests ALTER COLUMN repo_id SET NOT NULL;
+CREATE INDEX idx_pull_requests_repo_id ON pull_requests(repo_id);
+
+-- Rebuild user_pr_reviews as a partitioned table; a table can't be partitioned in place
+ALTER TABLE user_pr_reviews RENAME TO user_pr_reviews_unpartitioned;
+-- Free the constraint and index names for the new table
+ALTER TABLE user_pr_reviews_unpartitioned
+    DROP CONSTRAINT user_pr_reviews_pkey,
+    DROP CONSTRAINT user_pr_reviews_user_id_pr_id_key;
+DROP INDEX idx_user_pr_reviews_user_id, idx_user_pr_reviews_pr_id,
+    idx_user_pr_reviews_status, idx_user_pr_reviews_user_status;
+
+CREATE TABLE user_pr_reviews (
+    id SERIAL,
+    repo_id BIGINT NOT NULL REFERENCES repositories(id) ON DELETE CASCADE,
+    user_id TEXT NOT NULL REFERENCES users(github_user_id) ON DELETE CASCADE,
+    pr_id INTEGER NOT NULL REFERENCES pull_requests(id) ON DELETE CASCADE,
+    status review_status NOT NULL DEFAULT 'requested',
+    payout DECIMAL(10, 2) NOT NULL DEFAULT 0.00,
+    timestamp TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (repo_id, id),
+    UNIQUE(repo_id, user_id, pr_id)
+) PARTITION BY LIST (repo_id);
+
+CREATE TABLE user_pr_reviews_default PARTITION OF user_pr_reviews DEFAULT;
+CREATE TABLE user_pr_reviews_r0 PARTITION OF user_pr_reviews FOR VALUES IN (0);
+
+CREATE INDEX idx_user_pr_reviews_user_id ON user_pr_reviews(user_id);
+CREATE INDEX idx_user_pr_reviews_pr_id ON user_pr_reviews(pr_id);
+CREATE INDEX idx_user_pr_reviews_status ON user_pr_reviews(status);
+CREATE INDEX idx_user_pr_reviews_user_status ON user_pr_reviews(user_id, status);
+
+INSERT INTO user_pr_reviews (id, repo_id, user_id, pr_id, status, payout, timestamp)
+SELECT id, 0, user_id, pr_id, status, payout, timestamp FROM user_pr_reviews_unpartitioned;
+SELECT setval(pg_get_serial_sequence('user_pr_reviews', 'id'), COALESCE(MAX(id), 0) + 1, FALSE)
+FROM user_pr_reviews;
+DROP TABLE user_pr_reviews_unpartitioned;
+
+-- search_user_prs gains a repository filter; drop the old signature so PostgREST
+-- doesn't see two overloads
+DROP FUNCTION IF EXISTS search_user_prs(TEXT, TEXT, review_status, INTEGER);
+
+-- Ranked full-text search over a user's reviewed PRs (called via PostgREST RPC)
+CREATE OR REPLACE FUNCTION search_user_prs(
+    p_user_id TEXT,
+    p_query TEXT,
+    p_status review_status DEFAULT NULL,
+    p_limit INTEGER DEFAULT 20,
+    p_repo_id BIGINT DEFAULT NULL
+)
+RETURNS TABLE (
+    pr_id INTEGER,
+    pr_title TEXT,
+    pr_body TEXT,
+    pr_url TEXT,
+    pr_created_at TIMESTAMPTZ,
+    review_id INTEGER,
+    repo_id BIGINT,
+    user_id TEXT,
+    status review_status,
+    payout DECIMAL(10, 2),
+    review_timestamp TIMESTAMPTZ,
+    rank REAL
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT
+        pr.id, pr.title, pr.body, pr.url, pr.created_at,
+        r.id, r.repo_id, r.user_id, r.status, r.payout, r.timestamp,
+        ts_rank(pr.search_vector, query) AS rank
+    FROM user_pr_reviews r
+    JOIN pull_requests pr ON pr.id = r.pr_id
+    CROSS JOIN websearch_to_tsquery('english', p_query) AS query
+    WHERE r.user_id = p_user_id
+      AND (p_repo_id IS NULL OR r.repo_id = p_repo_id)
+      AND (p_status IS NULL OR r.status = p_status)
+      AND pr.search_vector @@ query
+    ORDER BY rank DESC, pr.created_at DESC
+    LIMIT p_limit;
+$$;
+
+-- Give every new repository its own review partition
+CREATE OR REPLACE FUNCTION create_repository_partition()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+BEGIN
+    EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS %I PARTITION OF user_pr_reviews FOR VALUES IN (%s)',
+        'user_pr_reviews_r' || NEW.id, NEW.id
+    );
+    RETURN NEW;
+END;
+$$;
+
+CREATE TRIGGER repositories_create_partition
+    AFTER INSERT ON repositories
+    FOR EACH ROW EXECUTE FUNCTION create_repository_partition();
+
+-- Archive a repository: stop accepting its webhooks and detach its review
+-- partition, which is kept as a standalone table for export or DROP
+CREATE OR REPLACE FUNCTION archive_repository(p_repo_id BIGINT)
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+BEGIN
+    UPDATE repositories SET archived_at = NOW() WHERE id = p_repo_id;
+    EXECUTE format('ALTER TABLE user_pr_reviews DETACH PARTITION %I', 'user_pr_reviews_r' || p_repo_id);
+END;
+$$;
+
+-- Admin-only: keep both out of reach of the anon and authenticated API roles
+REVOKE EXECUTE ON FUNCTION archive_repository(BIGINT), create_repository_partition()
+    FROM PUBLIC, anon, authenticated;
+
+COMMIT;
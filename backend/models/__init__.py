@@ -1,5 +1,5 @@
 from models.enums import ReviewStatus, PRAction
-from models.domain import User, PullRequest, UserPRReview, PRReviewWithDetails
+from models.domain import Repository, User, PullRequest, UserPRReview, PRReviewWithDetails, PRSearchResult
 from models.requests import ClaimPRRequest, ClaimPRResponse, ErrorResponse
 from models.webhook import (
     GitHubUser,
@@ -14,10 +14,12 @@ __all__ = [
     "ReviewStatus",
     "PRAction",
     # Domain models
+    "Repository",
     "User",
     "PullRequest",
     "UserPRReview",
     "PRReviewWithDetails",
+    "PRSearchResult",
     # Request/Response
     "ClaimPRRequest",
     "ClaimPRResponse",
@@ -5,6 +5,15 @@ from pydantic import BaseModel
 from models.enums import ReviewStatus
 
 
+class Repository(BaseModel):
+    id: int
+    full_name: str
+    html_url: str
+    private: bool = False
+    archived_at: datetime | None = None
+    created_at: datetime | None = None
+
+
 class User(BaseModel):
     github_user_id: str
     username: str | None = None
@@ -13,6 +22,7 @@ class User(BaseModel):
 
 class PullRequest(BaseModel):
     id: int
+    repo_id: int
     title: str
     body: str | None = None
     url: str
@@ -21,6 +31,7 @@ class PullRequest(BaseModel):
 
 class UserPRReview(BaseModel):
     id: int
+    repo_id: int
     user_id: str
     pr_id: int
     status: ReviewStatus
@@ -35,7 +46,12 @@ class PRReviewWithDetails(BaseModel):
     pr_url: str
     pr_created_at: datetime
     review_id: int
+    repo_id: int
     user_id: str
     status: ReviewStatus
     payout: float
     review_timestamp: datetime
+
+
+class PRSearchResult(PRReviewWithDetails):
+    rank: float
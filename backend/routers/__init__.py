@@ -1,4 +1,5 @@
 from routers.webhooks import router as webhooks_router
 from routers.reviews import router as reviews_router
+from routers.metrics import router as metrics_router
 
-__all__ = ["webhooks_router", "reviews_router"]
+__all__ = ["webhooks_router", "reviews_router", "metrics_router"]
@@ -4,8 +4,9 @@ import logging
 from fastapi import APIRouter, HTTPException, Query
 
 from db import get_db
+from metrics import CLAIMS_IN_FLIGHT
 from models.enums import ReviewStatus
-from models.domain import PRReviewWithDetails
+from models.domain import PRReviewWithDetails, PRSearchResult
 from models.requests import ClaimPRRequest, ClaimPRResponse
 from services.crypto_payment import get_payment_service
 
@@ -22,14 +23,15 @@ router = APIRouter(tags=["reviews"])
 def get_prs(
     user_id: str = Query(..., description="GitHub user ID of the reviewer"),
     status: ReviewStatus | None = Query(None, description="Filter by review status"),
+    repo_id: int | None = Query(None, description="Filter by GitHub repository ID"),
 ) -> list[dict[str, Any]]:
-    """Get all PR reviews for a specific user, with optional status filter."""
+    """Get all PR reviews for a specific user, with optional status and repository filters."""
     db = get_db()
 
     query = (
         db.table("user_pr_reviews")
         .select(
-            "id, user_id, pr_id, status, payout, timestamp, "
+            "id, repo_id, user_id, pr_id, status, payout, timestamp, "
             "pull_requests(id, title, body, url, created_at)"
         )
         .eq("user_id", user_id)
@@ -37,6 +39,8 @@ def get_prs(
 
     if status:
         query = query.eq("status", status.value)
+    if repo_id is not None:
+        query = query.eq("repo_id", repo_id)
 
     response = query.execute()
     data = cast(list[dict[str, Any]], response.data or [])
@@ -53,6 +57,7 @@ def get_prs(
                     "pr_url": pr_data["url"],
                     "pr_created_at": pr_data["created_at"],
                     "review_id": item["id"],
+                    "repo_id": item["repo_id"],
                     "user_id": item["user_id"],
                     "status": item["status"],
                     "payout": float(item["payout"]),
@@ -63,25 +68,65 @@ def get_prs(
     return results
 
 
+@router.get(
+    "/searchPRs",
+    response_model=list[PRSearchResult],
+    summary="Search a user's PR reviews",
+)
+def search_prs(
+    user_id: str = Query(..., description="GitHub user ID of the reviewer"),
+    q: str = Query(..., min_length=1, max_length=200, description="Search terms for PR title and body"),
+    status: ReviewStatus | None = Query(None, description="Filter by review status"),
+    repo_id: int | None = Query(None, description="Filter by GitHub repository ID"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of results"),
+) -> list[dict[str, Any]]:
+    """Full-text search over the titles and bodies of a user's reviewed PRs, best match first."""
+    db = get_db()
+
+    response = db.rpc(
+        "search_user_prs",
+        {
+            "p_user_id": user_id,
+            "p_query": q,
+            "p_status": status.value if status else None,
+            "p_limit": limit,
+            "p_repo_id": repo_id,
+        },
+    ).execute()
+    data = cast(list[dict[str, Any]], response.data or [])
+
+    return [{**item, "payout": float(item["payout"])} for item in data]
+
+
 @router.post(
     "/claimPR",
     response_model=ClaimPRResponse,
     summary="Claim a PR review",
 )
+@CLAIMS_IN_FLIGHT.track_inprogress()
 def claim_pr(request: ClaimPRRequest) -> ClaimPRResponse:
     """Claim a PR review and send ETH payment on Base Sepolia. Only works if the review status is 'claimable'."""
     db = get_db()
 
+    # Look up the PR's repository by primary key so the review queries only
+    # touch that repository's partition
+    pr_response = db.table("pull_requests").select("repo_id").eq("id", request.pr_id).execute()
+    pr_data = cast(list[dict[str, Any]], pr_response.data or [])
+    repo_id = pr_data[0]["repo_id"] if pr_data else None
+
     # Fetch the review details
-    review_response = (
-        db.table("user_pr_reviews")
-        .select("id, status, payout")
-        .eq("user_id", request.user_id)
-        .eq("pr_id", request.pr_id)
-        .execute()
-    )
+    data: list[dict[str, Any]] = []
+    if repo_id is not None:
+        review_response = (
+            db.table("user_pr_reviews")
+            .select("id, status, payout")
+            .eq("repo_id", repo_id)
+            .eq("user_id", request.user_id)
+            .eq("pr_id", request.pr_id)
+            .execute()
+        )
+        data = cast(list[dict[str, Any]], review_response.data or [])
 
-    data = cast(list[dict[str, Any]], review_response.data or [])
     if not data:
         raise HTTPException(
             status_code=404,
@@ -134,8 +179,8 @@ def claim_pr(request: ClaimPRRequest) -> ClaimPRResponse:
     if payment_result["success"]:
         # Payment successful - update status to claimed
         db.table("user_pr_reviews").update({"status": ReviewStatus.CLAIMED.value}).eq(
-            "user_id", request.user_id
-        ).eq("pr_id", request.pr_id).execute()
+            "repo_id", repo_id
+        ).eq("user_id", request.user_id).eq("pr_id", request.pr_id).execute()
 
         return ClaimPRResponse(
             success=True,
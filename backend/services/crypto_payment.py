@@ -1,14 +1,15 @@
 """
 Crypto payment service for handling native ETH payments on Base Sepolia testnet.
+
+web3 is imported inside the methods that need it so that importing this module
+(and every router that depends on it) stays cheap on cold start.
 """
 import logging
 from decimal import Decimal
 from typing import Optional
 
-from web3 import Web3
-from web3.exceptions import Web3Exception
-
 from config import get_settings
+from metrics import PENDING_TRANSACTIONS, RECEIPT_WAIT, rpc_metrics_middleware
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +19,8 @@ class CryptoPaymentService:
 
     def __init__(self):
         """Initialize the Web3 connection and wallet."""
+        from web3 import Web3
+
         settings = get_settings()
 
         # Validate configuration
@@ -28,6 +31,8 @@ class CryptoPaymentService:
 
         # Initialize Web3 with Base Sepolia RPC
         self.w3 = Web3(Web3.HTTPProvider(settings.BASE_SEPOLIA_RPC_URL))
+        if settings.INSTRUMENT_BACKENDS:
+            self.w3.middleware_onion.add(rpc_metrics_middleware(), name="metrics")
 
         # Check connection
         if not self.w3.is_connected():
@@ -49,6 +54,8 @@ class CryptoPaymentService:
         Returns:
             True if valid, False otherwise
         """
+        from web3 import Web3
+
         return Web3.is_address(address)
 
     def send_eth_payment(
@@ -69,6 +76,9 @@ class CryptoPaymentService:
                 - transaction_hash (str): The transaction hash if successful
                 - error (str): Error message if failed
         """
+        from web3 import Web3
+        from web3.exceptions import Web3Exception
+
         try:
             # Validate recipient address
             if not self.validate_address(recipient_address):
@@ -112,7 +122,8 @@ class CryptoPaymentService:
             logger.info(f"Transaction sent: {tx_hash_hex}")
 
             # Wait for transaction receipt
-            tx_receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
+            with PENDING_TRANSACTIONS.track_inprogress(), RECEIPT_WAIT.time():
+                tx_receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
 
             if tx_receipt.status == 1:
                 logger.info(f"Transaction successful: {tx_hash_hex}")
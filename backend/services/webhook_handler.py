@@ -1,72 +1,114 @@
 import logging
-from typing import Any, cast
-
-from supabase import Client
+from typing import TYPE_CHECKING, Any, cast
 
 from models.enums import ReviewStatus
 from models.webhook import (
     PullRequestWebhookPayload,
     PullRequestReviewWebhookPayload,
     GitHubUser,
+    RepositoryInfo,
 )
 
+if TYPE_CHECKING:
+    from supabase import Client
+
 logger = logging.getLogger(__name__)
 
 
-def upsert_user(db: Client, user: GitHubUser) -> None:
+def upsert_repository(db: "Client", repo: RepositoryInfo) -> bool:
+    """Record the repository; returns False if it has been archived.
+
+    Most deliveries come from repositories already on record, so look the row up
+    and only write when it is new or its name, URL or visibility changed, instead
+    of locking it on every delivery.
+    """
+    result = db.table("repositories").select("full_name, html_url, private, archived_at").eq("id", repo.id).execute()
+    data = cast(list[dict[str, Any]], result.data or [])
+    details = {"full_name": repo.full_name, "html_url": repo.html_url, "private": repo.private}
+
+    if not data:
+        # The insert trigger creates the repository's review partition
+        db.table("repositories").upsert(
+            {"id": repo.id, **details}, on_conflict="id", ignore_duplicates=True
+        ).execute()
+        return True
+
+    if any(data[0][column] != value for column, value in details.items()):
+        db.table("repositories").update(details).eq("id", repo.id).execute()
+    return not data[0].get("archived_at")
+
+
+def upsert_user(db: "Client", user: GitHubUser) -> None:
     db.table("users").upsert(
         {"github_user_id": str(user.id), "username": user.login},
         on_conflict="github_user_id",
     ).execute()
 
 
-def upsert_pull_request(db: Client, payload: PullRequestWebhookPayload) -> int:
+def upsert_pull_request(db: "Client", payload: PullRequestWebhookPayload) -> tuple[int, int]:
+    """Create the PR or refresh its title and body; returns (pr_id, repo_id).
+
+    An existing PR keeps its repo_id, so PRs migrated under placeholder
+    repository 0 keep their reviews in one partition.
+    """
     pr = payload.pull_request
-    result = db.table("pull_requests").upsert(
-        {"title": pr.title, "body": pr.body, "url": pr.html_url},
-        on_conflict="url",
-    ).execute()
+    details = {"title": pr.title, "body": pr.body}
 
+    result = db.table("pull_requests").update(details).eq("url", pr.html_url).execute()
     data = cast(list[dict[str, Any]], result.data or [])
-    if data:
-        return int(data[0]["id"])
-
-    fetch_result = db.table("pull_requests").select("id").eq("url", pr.html_url).execute()
-    fetch_data = cast(list[dict[str, Any]], fetch_result.data or [])
-    return int(fetch_data[0]["id"])
-
-
-def insert_pull_request(db: Client, payload: PullRequestWebhookPayload) -> int:
+    if not data:
+        result = db.table("pull_requests").upsert(
+            {"repo_id": payload.repository.id, "url": pr.html_url, **details},
+            on_conflict="url",
+            ignore_duplicates=True,
+        ).execute()
+        data = cast(list[dict[str, Any]], result.data or [])
+    if not data:
+        # Inserted concurrently by another delivery
+        result = db.table("pull_requests").update(details).eq("url", pr.html_url).execute()
+        data = cast(list[dict[str, Any]], result.data or [])
+
+    return int(data[0]["id"]), int(data[0]["repo_id"])
+
+
+def insert_pull_request(db: "Client", payload: PullRequestWebhookPayload) -> int:
     pr = payload.pull_request
     result = db.table("pull_requests").insert(
-        {"title": pr.title, "body": pr.body, "url": pr.html_url}
+        {"repo_id": payload.repository.id, "title": pr.title, "body": pr.body, "url": pr.html_url}
     ).execute()
 
     data = cast(list[dict[str, Any]], result.data or [])
     return int(data[0]["id"])
 
 
-def handle_pr_opened(db: Client, payload: PullRequestWebhookPayload) -> None:
+def handle_pr_opened(db: "Client", payload: PullRequestWebhookPayload) -> None:
     pr = payload.pull_request
+    if not upsert_repository(db, payload.repository):
+        logger.info("Ignoring PR #%d from archived repository %s", pr.number, payload.repository.full_name)
+        return
+
     insert_pull_request(db, payload)
     logger.info("PR #%d opened", pr.number)
 
 
-def handle_pr_closed(db: Client, payload: PullRequestWebhookPayload) -> None:
+def handle_pr_closed(db: "Client", payload: PullRequestWebhookPayload) -> None:
     pr = payload.pull_request
 
-    pr_result = db.table("pull_requests").select("id").eq("url", pr.html_url).execute()
+    pr_result = db.table("pull_requests").select("id, repo_id").eq("url", pr.html_url).execute()
     pr_data = cast(list[dict[str, Any]], pr_result.data or [])
     if not pr_data:
         logger.warning("PR not found: %s", pr.html_url)
         return
 
     pr_id = pr_data[0]["id"]
+    # Taken from the PR row so review updates only touch that repo's partition
+    repo_id = pr_data[0]["repo_id"]
 
     if pr.merged:
         (
             db.table("user_pr_reviews")
             .update({"status": ReviewStatus.CLAIMABLE.value})
+            .eq("repo_id", repo_id)
             .eq("pr_id", pr_id)
             .eq("status", ReviewStatus.APPROVED.value)
             .execute()
@@ -74,6 +116,7 @@ def handle_pr_closed(db: Client, payload: PullRequestWebhookPayload) -> None:
         (
             db.table("user_pr_reviews")
             .update({"status": ReviewStatus.INELIGIBLE.value})
+            .eq("repo_id", repo_id)
             .eq("pr_id", pr_id)
             .eq("status", ReviewStatus.REQUESTED.value)
             .execute()
@@ -82,6 +125,7 @@ def handle_pr_closed(db: Client, payload: PullRequestWebhookPayload) -> None:
         (
             db.table("user_pr_reviews")
             .update({"status": ReviewStatus.INELIGIBLE.value})
+            .eq("repo_id", repo_id)
             .eq("pr_id", pr_id)
             .in_("status", [ReviewStatus.REQUESTED.value, ReviewStatus.APPROVED.value])
             .execute()
@@ -90,7 +134,7 @@ def handle_pr_closed(db: Client, payload: PullRequestWebhookPayload) -> None:
     logger.info("PR #%d %s", pr.number, "merged" if pr.merged else "closed")
 
 
-def handle_review_requested(db: Client, payload: PullRequestWebhookPayload) -> None:
+def handle_review_requested(db: "Client", payload: PullRequestWebhookPayload) -> None:
     pr = payload.pull_request
     reviewer = payload.requested_reviewer
 
@@ -98,23 +142,28 @@ def handle_review_requested(db: Client, payload: PullRequestWebhookPayload) -> N
         logger.warning("No reviewer in review_requested for PR #%d", pr.number)
         return
 
+    if not upsert_repository(db, payload.repository):
+        logger.info("Ignoring PR #%d from archived repository %s", pr.number, payload.repository.full_name)
+        return
+
     upsert_user(db, reviewer)
-    pr_id = upsert_pull_request(db, payload)
+    pr_id, repo_id = upsert_pull_request(db, payload)
 
     db.table("user_pr_reviews").upsert(
         {
+            "repo_id": repo_id,
             "user_id": str(reviewer.id),
             "pr_id": pr_id,
             "status": ReviewStatus.REQUESTED.value,
             "payout": 1.00,
         },
-        on_conflict="user_id,pr_id",
+        on_conflict="repo_id,user_id,pr_id",
     ).execute()
 
     logger.info("Review requested: %s for PR #%d", reviewer.login, pr.number)
 
 
-def handle_review_submitted(db: Client, payload: PullRequestReviewWebhookPayload) -> None:
+def handle_review_submitted(db: "Client", payload: PullRequestReviewWebhookPayload) -> None:
     review = payload.review
     pr = payload.pull_request
 
@@ -122,18 +171,20 @@ def handle_review_submitted(db: Client, payload: PullRequestReviewWebhookPayload
         logger.debug("Ignoring review state: %s", review.state)
         return
 
-    pr_result = db.table("pull_requests").select("id").eq("url", pr.html_url).execute()
+    pr_result = db.table("pull_requests").select("id, repo_id").eq("url", pr.html_url).execute()
     pr_data = cast(list[dict[str, Any]], pr_result.data or [])
     if not pr_data:
         logger.warning("PR not found: %s", pr.html_url)
         return
 
     pr_id = pr_data[0]["id"]
+    repo_id = pr_data[0]["repo_id"]
     reviewer_id = str(review.user.id)
 
     (
         db.table("user_pr_reviews")
         .update({"status": ReviewStatus.APPROVED.value})
+        .eq("repo_id", repo_id)
         .eq("pr_id", pr_id)
         .eq("user_id", reviewer_id)
         .eq("status", ReviewStatus.REQUESTED.value)
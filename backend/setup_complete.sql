@@ -24,25 +24,47 @@ CREATE TABLE users (
     created_at TIMESTAMPTZ DEFAULT NOW()
 );
 
+-- Repositories (GitHub repositories sending webhooks, keyed by GitHub repo ID)
+CREATE TABLE repositories (
+    id BIGINT PRIMARY KEY,
+    full_name TEXT NOT NULL,
+    html_url TEXT NOT NULL,
+    private BOOLEAN NOT NULL DEFAULT FALSE,
+    archived_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
 -- Pull Requests table
 CREATE TABLE pull_requests (
     id SERIAL PRIMARY KEY,
+    repo_id BIGINT NOT NULL REFERENCES repositories(id) ON DELETE CASCADE,
     title TEXT NOT NULL,
     body TEXT,
     url TEXT NOT NULL,
-    created_at TIMESTAMPTZ DEFAULT NOW()
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    -- Weighted full-text document: title ranks above body
+    search_vector TSVECTOR GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(body, '')), 'B')
+    ) STORED
 );
 
--- User PR Reviews (M2M relationship table)
+-- User PR Reviews (M2M relationship table), list-partitioned by repository so
+-- each repo's rows and indexes live in their own partition
 CREATE TABLE user_pr_reviews (
-    id SERIAL PRIMARY KEY,
+    id SERIAL,
+    repo_id BIGINT NOT NULL REFERENCES repositories(id) ON DELETE CASCADE,
     user_id TEXT NOT NULL REFERENCES users(github_user_id) ON DELETE CASCADE,
     pr_id INTEGER NOT NULL REFERENCES pull_requests(id) ON DELETE CASCADE,
     status review_status NOT NULL DEFAULT 'requested',
     payout DECIMAL(10, 2) NOT NULL DEFAULT 0.00,
     timestamp TIMESTAMPTZ DEFAULT NOW(),
-    UNIQUE(user_id, pr_id)
-);
+    PRIMARY KEY (repo_id, id),
+    UNIQUE(repo_id, user_id, pr_id)
+) PARTITION BY LIST (repo_id);
+
+-- Catch-all for rows whose repository has no partition of its own
+CREATE TABLE user_pr_reviews_default PARTITION OF user_pr_reviews DEFAULT;
 
 -- STEP 3: Create indexes for better query performance
 -- ========================================
@@ -50,9 +72,89 @@ CREATE INDEX idx_user_pr_reviews_user_id ON user_pr_reviews(user_id);
 CREATE INDEX idx_user_pr_reviews_pr_id ON user_pr_reviews(pr_id);
 CREATE INDEX idx_user_pr_reviews_status ON user_pr_reviews(status);
 CREATE INDEX idx_user_pr_reviews_user_status ON user_pr_reviews(user_id, status);
+CREATE INDEX idx_pull_requests_search ON pull_requests USING GIN (search_vector);
+CREATE INDEX idx_pull_requests_repo_id ON pull_requests(repo_id);
+
+-- Ranked full-text search over a user's reviewed PRs (called via PostgREST RPC)
+CREATE OR REPLACE FUNCTION search_user_prs(
+    p_user_id TEXT,
+    p_query TEXT,
+    p_status review_status DEFAULT NULL,
+    p_limit INTEGER DEFAULT 20,
+    p_repo_id BIGINT DEFAULT NULL
+)
+RETURNS TABLE (
+    pr_id INTEGER,
+    pr_title TEXT,
+    pr_body TEXT,
+    pr_url TEXT,
+    pr_created_at TIMESTAMPTZ,
+    review_id INTEGER,
+    repo_id BIGINT,
+    user_id TEXT,
+    status review_status,
+    payout DECIMAL(10, 2),
+    review_timestamp TIMESTAMPTZ,
+    rank REAL
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT
+        pr.id, pr.title, pr.body, pr.url, pr.created_at,
+        r.id, r.repo_id, r.user_id, r.status, r.payout, r.timestamp,
+        ts_rank(pr.search_vector, query) AS rank
+    FROM user_pr_reviews r
+    JOIN pull_requests pr ON pr.id = r.pr_id
+    CROSS JOIN websearch_to_tsquery('english', p_query) AS query
+    WHERE r.user_id = p_user_id
+      AND (p_repo_id IS NULL OR r.repo_id = p_repo_id)
+      AND (p_status IS NULL OR r.status = p_status)
+      AND pr.search_vector @@ query
+    ORDER BY rank DESC, pr.created_at DESC
+    LIMIT p_limit;
+$$;
+
+-- Give every new repository its own review partition
+CREATE OR REPLACE FUNCTION create_repository_partition()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+BEGIN
+    EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS %I PARTITION OF user_pr_reviews FOR VALUES IN (%s)',
+        'user_pr_reviews_r' || NEW.id, NEW.id
+    );
+    RETURN NEW;
+END;
+$$;
+
+CREATE TRIGGER repositories_create_partition
+    AFTER INSERT ON repositories
+    FOR EACH ROW EXECUTE FUNCTION create_repository_partition();
+
+-- Archive a repository: stop accepting its webhooks and detach its review
+-- partition, which is kept as a standalone table for export or DROP
+CREATE OR REPLACE FUNCTION archive_repository(p_repo_id BIGINT)
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+BEGIN
+    UPDATE repositories SET archived_at = NOW() WHERE id = p_repo_id;
+    EXECUTE format('ALTER TABLE user_pr_reviews DETACH PARTITION %I', 'user_pr_reviews_r' || p_repo_id);
+END;
+$$;
+
+-- Admin-only: keep both out of reach of the anon and authenticated API roles
+REVOKE EXECUTE ON FUNCTION archive_repository(BIGINT), create_repository_partition()
+    FROM PUBLIC, anon, authenticated;
 
 -- STEP 4: Disable Row Level Security for development
 -- ========================================
+ALTER TABLE repositories DISABLE ROW LEVEL SECURITY;
 ALTER TABLE users DISABLE ROW LEVEL SECURITY;
 ALTER TABLE pull_requests DISABLE ROW LEVEL SECURITY;
 ALTER TABLE user_pr_reviews DISABLE ROW LEVEL SECURITY;
@@ -60,6 +162,10 @@ ALTER TABLE user_pr_reviews DISABLE ROW LEVEL SECURITY;
 -- STEP 5: Insert mock data
 -- ========================================
 
+-- Insert mock repository (creates its user_pr_reviews partition)
+INSERT INTO repositories (id, full_name, html_url, private) VALUES
+(1, 'example/repo', 'https://github.com/example/repo', FALSE);
+
 -- Insert mock users
 INSERT INTO users (github_user_id, username, created_at) VALUES
 ('user1', 'alice_dev', NOW() - INTERVAL '30 days'),
@@ -69,77 +175,79 @@ INSERT INTO users (github_user_id, username, created_at) VALUES
 ('user5', 'evan_developer', NOW() - INTERVAL '10 days');
 
 -- Insert mock pull requests
-INSERT INTO pull_requests (title, body, url, created_at) VALUES
-('Add user authentication system', 'Implements OAuth 2.0 flow with JWT tokens', 'https://github.com/example/repo/pull/101', NOW() - INTERVAL '28 days'),
-('Fix memory leak in data processor', 'Resolves issue #234 by properly disposing resources', 'https://github.com/example/repo/pull/102', NOW() - INTERVAL '26 days'),
-('Update React components to TypeScript', 'Migrates all components from JS to TS for better type safety', 'https://github.com/example/repo/pull/103', NOW() - INTERVAL '24 days'),
-('Implement dark mode toggle', 'Adds theme switching functionality with persistent storage', 'https://github.com/example/repo/pull/104', NOW() - INTERVAL '22 days'),
-('Optimize database queries', 'Reduces query time by 60% through indexing and query optimization', 'https://github.com/example/repo/pull/105', NOW() - INTERVAL '20 days'),
-('Add unit tests for API endpoints', 'Achieves 90% test coverage for REST API', 'https://github.com/example/repo/pull/106', NOW() - INTERVAL '18 days'),
-('Refactor authentication middleware', 'Simplifies auth logic and improves error handling', 'https://github.com/example/repo/pull/107', NOW() - INTERVAL '16 days'),
-('Implement file upload feature', 'Adds drag-and-drop file upload with progress tracking', 'https://github.com/example/repo/pull/108', NOW() - INTERVAL '14 days'),
-('Fix CSS styling issues on mobile', 'Resolves responsive design problems on small screens', 'https://github.com/example/repo/pull/109', NOW() - INTERVAL '12 days'),
-('Add email notification system', 'Sends automated emails for important events', 'https://github.com/example/repo/pull/110', NOW() - INTERVAL '10 days'),
-('Upgrade dependencies to latest versions', 'Updates all npm packages and fixes breaking changes', 'https://github.com/example/repo/pull/111', NOW() - INTERVAL '8 days'),
-('Implement search functionality', 'Adds full-text search with filters and pagination', 'https://github.com/example/repo/pull/112', NOW() - INTERVAL '6 days'),
-('Add user profile page', 'Creates customizable user profile with avatar upload', 'https://github.com/example/repo/pull/113', NOW() - INTERVAL '4 days'),
-('Fix security vulnerability in login', 'Patches XSS vulnerability in login form', 'https://github.com/example/repo/pull/114', NOW() - INTERVAL '2 days'),
-('Improve error handling in API', 'Adds consistent error responses across all endpoints', 'https://github.com/example/repo/pull/115', NOW() - INTERVAL '1 day');
+INSERT INTO pull_requests (repo_id, title, body, url, created_at) VALUES
+(1, 'Add user authentication system', 'Implements OAuth 2.0 flow with JWT tokens', 'https://github.com/example/repo/pull/101', NOW() - INTERVAL '28 days'),
+(1, 'Fix memory leak in data processor', 'Resolves issue #234 by properly disposing resources', 'https://github.com/example/repo/pull/102', NOW() - INTERVAL '26 days'),
+(1, 'Update React components to TypeScript', 'Migrates all components from JS to TS for better type safety', 'https://github.com/example/repo/pull/103', NOW() - INTERVAL '24 days'),
+(1, 'Implement dark mode toggle', 'Adds theme switching functionality with persistent storage', 'https://github.com/example/repo/pull/104', NOW() - INTERVAL '22 days'),
+(1, 'Optimize database queries', 'Reduces query time by 60% through indexing and query optimization', 'https://github.com/example/repo/pull/105', NOW() - INTERVAL '20 days'),
+(1, 'Add unit tests for API endpoints', 'Achieves 90% test coverage for REST API', 'https://github.com/example/repo/pull/106', NOW() - INTERVAL '18 days'),
+(1, 'Refactor authentication middleware', 'Simplifies auth logic and improves error handling', 'https://github.com/example/repo/pull/107', NOW() - INTERVAL '16 days'),
+(1, 'Implement file upload feature', 'Adds drag-and-drop file upload with progress tracking', 'https://github.com/example/repo/pull/108', NOW() - INTERVAL '14 days'),
+(1, 'Fix CSS styling issues on mobile', 'Resolves responsive design problems on small screens', 'https://github.com/example/repo/pull/109', NOW() - INTERVAL '12 days'),
+(1, 'Add email notification system', 'Sends automated emails for important events', 'https://github.com/example/repo/pull/110', NOW() - INTERVAL '10 days'),
+(1, 'Upgrade dependencies to latest versions', 'Updates all npm packages and fixes breaking changes', 'https://github.com/example/repo/pull/111', NOW() - INTERVAL '8 days'),
+(1, 'Implement search functionality', 'Adds full-text search with filters and pagination', 'https://github.com/example/repo/pull/112', NOW() - INTERVAL '6 days'),
+(1, 'Add user profile page', 'Creates customizable user profile with avatar upload', 'https://github.com/example/repo/pull/113', NOW() - INTERVAL '4 days'),
+(1, 'Fix security vulnerability in login', 'Patches XSS vulnerability in login form', 'https://github.com/example/repo/pull/114', NOW() - INTERVAL '2 days'),
+(1, 'Improve error handling in API', 'Adds consistent error responses across all endpoints', 'https://github.com/example/repo/pull/115', NOW() - INTERVAL '1 day');
 
 -- Insert mock user PR reviews with various statuses (all payouts = $1.00)
 
 -- user1 reviews (mix of all statuses)
-INSERT INTO user_pr_reviews (user_id, pr_id, status, payout, timestamp) VALUES
-('user1', 1, 'done', 1.00, NOW() - INTERVAL '27 days'),
-('user1', 2, 'done', 1.00, NOW() - INTERVAL '25 days'),
-('user1', 3, 'claimed', 1.00, NOW() - INTERVAL '23 days'),
-('user1', 4, 'claimable', 1.00, NOW() - INTERVAL '21 days'),
-('user1', 5, 'claimable', 1.00, NOW() - INTERVAL '19 days'),
-('user1', 6, 'requested', 1.00, NOW() - INTERVAL '17 days');
+INSERT INTO user_pr_reviews (repo_id, user_id, pr_id, status, payout, timestamp) VALUES
+(1, 'user1', 1, 'done', 1.00, NOW() - INTERVAL '27 days'),
+(1, 'user1', 2, 'done', 1.00, NOW() - INTERVAL '25 days'),
+(1, 'user1', 3, 'claimed', 1.00, NOW() - INTERVAL '23 days'),
+(1, 'user1', 4, 'claimable', 1.00, NOW() - INTERVAL '21 days'),
+(1, 'user1', 5, 'claimable', 1.00, NOW() - INTERVAL '19 days'),
+(1, 'user1', 6, 'requested', 1.00, NOW() - INTERVAL '17 days');
 
 -- user2 reviews
-INSERT INTO user_pr_reviews (user_id, pr_id, status, payout, timestamp) VALUES
-('user2', 2, 'done', 1.00, NOW() - INTERVAL '24 days'),
-('user2', 4, 'done', 1.00, NOW() - INTERVAL '20 days'),
-('user2', 6, 'claimed', 1.00, NOW() - INTERVAL '16 days'),
-('user2', 7, 'claimable', 1.00, NOW() - INTERVAL '15 days'),
-('user2', 8, 'claimable', 1.00, NOW() - INTERVAL '13 days'),
-('user2', 9, 'requested', 1.00, NOW() - INTERVAL '11 days'),
-('user2', 10, 'ineligible', 1.00, NOW() - INTERVAL '9 days');
+INSERT INTO user_pr_reviews (repo_id, user_id, pr_id, status, payout, timestamp) VALUES
+(1, 'user2', 2, 'done', 1.00, NOW() - INTERVAL '24 days'),
+(1, 'user2', 4, 'done', 1.00, NOW() - INTERVAL '20 days'),
+(1, 'user2', 6, 'claimed', 1.00, NOW() - INTERVAL '16 days'),
+(1, 'user2', 7, 'claimable', 1.00, NOW() - INTERVAL '15 days'),
+(1, 'user2', 8, 'claimable', 1.00, NOW() - INTERVAL '13 days'),
+(1, 'user2', 9, 'requested', 1.00, NOW() - INTERVAL '11 days'),
+(1, 'user2', 10, 'ineligible', 1.00, NOW() - INTERVAL '9 days');
 
 -- user3 reviews
-INSERT INTO user_pr_reviews (user_id, pr_id, status, payout, timestamp) VALUES
-('user3', 1, 'done', 1.00, NOW() - INTERVAL '26 days'),
-('user3', 5, 'claimed', 1.00, NOW() - INTERVAL '18 days'),
-('user3', 9, 'claimable', 1.00, NOW() - INTERVAL '10 days'),
-('user3', 11, 'claimable', 1.00, NOW() - INTERVAL '7 days'),
-('user3', 12, 'requested', 1.00, NOW() - INTERVAL '5 days'),
-('user3', 13, 'requested', 1.00, NOW() - INTERVAL '3 days');
+INSERT INTO user_pr_reviews (repo_id, user_id, pr_id, status, payout, timestamp) VALUES
+(1, 'user3', 1, 'done', 1.00, NOW() - INTERVAL '26 days'),
+(1, 'user3', 5, 'claimed', 1.00, NOW() - INTERVAL '18 days'),
+(1, 'user3', 9, 'claimable', 1.00, NOW() - INTERVAL '10 days'),
+(1, 'user3', 11, 'claimable', 1.00, NOW() - INTERVAL '7 days'),
+(1, 'user3', 12, 'requested', 1.00, NOW() - INTERVAL '5 days'),
+(1, 'user3', 13, 'requested', 1.00, NOW() - INTERVAL '3 days');
 
 -- user4 reviews
-INSERT INTO user_pr_reviews (user_id, pr_id, status, payout, timestamp) VALUES
-('user4', 3, 'done', 1.00, NOW() - INTERVAL '22 days'),
-('user4', 7, 'claimed', 1.00, NOW() - INTERVAL '14 days'),
-('user4', 10, 'claimable', 1.00, NOW() - INTERVAL '8 days'),
-('user4', 13, 'claimable', 1.00, NOW() - INTERVAL '2 days'),
-('user4', 14, 'requested', 1.00, NOW() - INTERVAL '1 day'),
-('user4', 15, 'ineligible', 1.00, NOW() - INTERVAL '12 hours');
+INSERT INTO user_pr_reviews (repo_id, user_id, pr_id, status, payout, timestamp) VALUES
+(1, 'user4', 3, 'done', 1.00, NOW() - INTERVAL '22 days'),
+(1, 'user4', 7, 'claimed', 1.00, NOW() - INTERVAL '14 days'),
+(1, 'user4', 10, 'claimable', 1.00, NOW() - INTERVAL '8 days'),
+(1, 'user4', 13, 'claimable', 1.00, NOW() - INTERVAL '2 days'),
+(1, 'user4', 14, 'requested', 1.00, NOW() - INTERVAL '1 day'),
+(1, 'user4', 15, 'ineligible', 1.00, NOW() - INTERVAL '12 hours');
 
 -- user5 reviews
-INSERT INTO user_pr_reviews (user_id, pr_id, status, payout, timestamp) VALUES
-('user5', 8, 'claimed', 1.00, NOW() - INTERVAL '12 days'),
-('user5', 11, 'claimable', 1.00, NOW() - INTERVAL '6 days'),
-('user5', 14, 'claimable', 1.00, NOW() - INTERVAL '1 day'),
-('user5', 15, 'requested', 1.00, NOW() - INTERVAL '6 hours');
+INSERT INTO user_pr_reviews (repo_id, user_id, pr_id, status, payout, timestamp) VALUES
+(1, 'user5', 8, 'claimed', 1.00, NOW() - INTERVAL '12 days'),
+(1, 'user5', 11, 'claimable', 1.00, NOW() - INTERVAL '6 days'),
+(1, 'user5', 14, 'claimable', 1.00, NOW() - INTERVAL '1 day'),
+(1, 'user5', 15, 'requested', 1.00, NOW() - INTERVAL '6 hours');
 
 -- ========================================
 -- SETUP COMPLETE!
 -- ========================================
 -- Summary:
 -- ✓ Created enum type: review_status
--- ✓ Created 3 tables: users, pull_requests, user_pr_reviews
+-- ✓ Created 4 tables: repositories, users, pull_requests, user_pr_reviews (partitioned by repo)
 -- ✓ Created indexes for performance
+-- ✓ Created full-text search column, GIN index and search_user_prs()
 -- ✓ Disabled RLS for development
+-- ✓ Inserted 1 repository
 -- ✓ Inserted 5 users
 -- ✓ Inserted 15 pull requests
 -- ✓ Inserted 30 review records
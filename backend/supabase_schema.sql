@@ -18,33 +18,136 @@ CREATE TABLE users (
     created_at TIMESTAMPTZ DEFAULT NOW()
 );
 
+-- Repositories (GitHub repositories sending webhooks, keyed by GitHub repo ID)
+CREATE TABLE repositories (
+    id BIGINT PRIMARY KEY,
+    full_name TEXT NOT NULL,
+    html_url TEXT NOT NULL,
+    private BOOLEAN NOT NULL DEFAULT FALSE,
+    archived_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
 -- Pull Requests table
 CREATE TABLE pull_requests (
     id SERIAL PRIMARY KEY,
+    repo_id BIGINT NOT NULL REFERENCES repositories(id) ON DELETE CASCADE,
     title TEXT NOT NULL,
     body TEXT,
     url TEXT NOT NULL UNIQUE,
-    created_at TIMESTAMPTZ DEFAULT NOW()
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    -- Weighted full-text document: title ranks above body
+    search_vector TSVECTOR GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(body, '')), 'B')
+    ) STORED
 );
 
--- User PR Reviews (M2M relationship table)
+-- User PR Reviews (M2M relationship table), list-partitioned by repository so
+-- each repo's rows and indexes live in their own partition
 CREATE TABLE user_pr_reviews (
-    id SERIAL PRIMARY KEY,
+    id SERIAL,
+    repo_id BIGINT NOT NULL REFERENCES repositories(id) ON DELETE CASCADE,
     user_id TEXT NOT NULL REFERENCES users(github_user_id) ON DELETE CASCADE,
     pr_id INTEGER NOT NULL REFERENCES pull_requests(id) ON DELETE CASCADE,
     status review_status NOT NULL DEFAULT 'requested',
     payout DECIMAL(10, 2) NOT NULL DEFAULT 0.00,
     timestamp TIMESTAMPTZ DEFAULT NOW(),
-    UNIQUE(user_id, pr_id)
-);
+    PRIMARY KEY (repo_id, id),
+    UNIQUE(repo_id, user_id, pr_id)
+) PARTITION BY LIST (repo_id);
+
+-- Catch-all for rows whose repository has no partition of its own
+CREATE TABLE user_pr_reviews_default PARTITION OF user_pr_reviews DEFAULT;
 
 -- Create indexes for better query performance
 CREATE INDEX idx_user_pr_reviews_user_id ON user_pr_reviews(user_id);
 CREATE INDEX idx_user_pr_reviews_pr_id ON user_pr_reviews(pr_id);
 CREATE INDEX idx_user_pr_reviews_status ON user_pr_reviews(status);
 CREATE INDEX idx_user_pr_reviews_user_status ON user_pr_reviews(user_id, status);
+CREATE INDEX idx_pull_requests_search ON pull_requests USING GIN (search_vector);
+CREATE INDEX idx_pull_requests_repo_id ON pull_requests(repo_id);
+
+-- Ranked full-text search over a user's reviewed PRs (called via PostgREST RPC)
+CREATE OR REPLACE FUNCTION search_user_prs(
+    p_user_id TEXT,
+    p_query TEXT,
+    p_status review_status DEFAULT NULL,
+    p_limit INTEGER DEFAULT 20,
+    p_repo_id BIGINT DEFAULT NULL
+)
+RETURNS TABLE (
+    pr_id INTEGER,
+    pr_title TEXT,
+    pr_body TEXT,
+    pr_url TEXT,
+    pr_created_at TIMESTAMPTZ,
+    review_id INTEGER,
+    repo_id BIGINT,
+    user_id TEXT,
+    status review_status,
+    payout DECIMAL(10, 2),
+    review_timestamp TIMESTAMPTZ,
+    rank REAL
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT
+        pr.id, pr.title, pr.body, pr.url, pr.created_at,
+        r.id, r.repo_id, r.user_id, r.status, r.payout, r.timestamp,
+        ts_rank(pr.search_vector, query) AS rank
+    FROM user_pr_reviews r
+    JOIN pull_requests pr ON pr.id = r.pr_id
+    CROSS JOIN websearch_to_tsquery('english', p_query) AS query
+    WHERE r.user_id = p_user_id
+      AND (p_repo_id IS NULL OR r.repo_id = p_repo_id)
+      AND (p_status IS NULL OR r.status = p_status)
+      AND pr.search_vector @@ query
+    ORDER BY rank DESC, pr.created_at DESC
+    LIMIT p_limit;
+$$;
+
+-- Give every new repository its own review partition
+CREATE OR REPLACE FUNCTION create_repository_partition()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+BEGIN
+    EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS %I PARTITION OF user_pr_reviews FOR VALUES IN (%s)',
+        'user_pr_reviews_r' || NEW.id, NEW.id
+    );
+    RETURN NEW;
+END;
+$$;
+
+CREATE TRIGGER repositories_create_partition
+    AFTER INSERT ON repositories
+    FOR EACH ROW EXECUTE FUNCTION create_repository_partition();
+
+-- Archive a repository: stop accepting its webhooks and detach its review
+-- partition, which is kept as a standalone table for export or DROP
+CREATE OR REPLACE FUNCTION archive_repository(p_repo_id BIGINT)
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+BEGIN
+    UPDATE repositories SET archived_at = NOW() WHERE id = p_repo_id;
+    EXECUTE format('ALTER TABLE user_pr_reviews DETACH PARTITION %I', 'user_pr_reviews_r' || p_repo_id);
+END;
+$$;
+
+-- Admin-only: keep both out of reach of the anon and authenticated API roles
+REVOKE EXECUTE ON FUNCTION archive_repository(BIGINT), create_repository_partition()
+    FROM PUBLIC, anon, authenticated;
 
 -- Add comments for documentation
+COMMENT ON TABLE repositories IS 'GitHub repositories that send PR webhooks';
+COMMENT ON COLUMN repositories.archived_at IS 'Set by archive_repository(); webhooks for archived repositories are ignored';
 COMMENT ON TABLE users IS 'GitHub users who review pull requests';
 COMMENT ON TABLE pull_requests IS 'Pull requests that can be reviewed';
 COMMENT ON TABLE user_pr_reviews IS 'Many-to-many relationship tracking user reviews of PRs with payout information';